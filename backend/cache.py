@@ -95,23 +95,28 @@ def get_cached(key: str) -> Optional[Any]:
     return None
 
 
-def set_cached(key: str, value: Any, ttl_hours: int = DEFAULT_TTL_HOURS) -> None:
+def set_cached(key: str, value: Any, ttl_hours: float = DEFAULT_TTL_HOURS) -> None:
     """Set a cached value with TTL"""
-    expires_at = datetime.now() + timedelta(hours=ttl_hours)
+    # Stored in SQLite's own UTC "YYYY-MM-DD HH:MM:SS" format so the
+    # expires_at > datetime('now') comparisons are correct
+    expires_at = datetime.utcnow() + timedelta(hours=ttl_hours)
+    
+    # Serialize value before opening the write transaction
+    json_value = json.dumps(value)
     
     with get_cache_db() as conn:
         cursor = conn.cursor()
         
-        # Serialize value
-        if isinstance(value, (dict, list)):
-            json_value = json.dumps(value)
-        else:
-            json_value = json.dumps(value)
-        
+        # Upsert in place (same reset of created_at/hit_count as a fresh row)
         cursor.execute("""
-            INSERT OR REPLACE INTO cache (key, value, expires_at, hit_count)
+            INSERT INTO cache (key, value, expires_at, hit_count)
             VALUES (?, ?, ?, 0)
-        """, (key, json_value, expires_at.isoformat()))
+            ON CONFLICT(key) DO UPDATE SET
+                value = excluded.value,
+                expires_at = excluded.expires_at,
+                created_at = CURRENT_TIMESTAMP,
+                hit_count = 0
+        """, (key, json_value, expires_at.strftime('%Y-%m-%d %H:%M:%S')))
 
 
 def delete_cached(key: str) -> bool:
@@ -1,17 +1,54 @@
+import asyncio
+import functools
 import logging
-import requests
+import httpx
 import json
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Tuple, Union
 from datetime import datetime, timedelta
+import math
 import random
 import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Try to import numpy for faster price statistics
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# orjson decodes Yahoo payloads several times faster than stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Persistent SQLite response cache (backend/cache.py). Optional so the
+# collector still works where the cache database can't be created.
+try:
+    from cache import get_cached, set_cached
+    DISK_CACHE_AVAILABLE = True
+except Exception:
+    DISK_CACHE_AVAILABLE = False
+
+# HTTP/2 for the httpx clients needs the `h2` package (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # Constants for Yahoo Finance API
 BASE_URL = "https://query1.finance.yahoo.com/v10/finance/quoteSummary/"
 CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/"
+QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+QUOTE_BATCH_SIZE = 20
 
 # List of user agents to avoid rate limiting
 USER_AGENTS = [
@@ -20,81 +57,332 @@ USER_AGENTS = [
     'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
 ]
 
+# All quoteSummary modules needed by get_stock_info and get_historical_financials,
+# requested together so both share one round-trip per ticker
+QUOTE_SUMMARY_MODULES = (
+    "financialData,summaryDetail,price,defaultKeyStatistics,summaryProfile,"
+    "incomeStatementHistory,balanceSheetHistory,cashflowStatementHistory"
+)
+QUOTE_SUMMARY_TTL = 60  # seconds
+
+# Leaves of each quoteSummary module read by _parse_stock_info / _parse_financials
+_QUOTE_SUMMARY_INFO_FIELDS = {
+    'price': ('longName', 'marketCap'),
+    'summaryProfile': ('sector', 'industry', 'website', 'longBusinessSummary'),
+    'financialData': (
+        'currentPrice', 'profitMargins', 'operatingMargins', 'returnOnEquity',
+        'returnOnAssets', 'totalRevenue', 'revenueGrowth', 'ebitda', 'totalDebt',
+        'totalCash', 'freeCashflow', 'debtToEquity', 'currentRatio',
+    ),
+    'summaryDetail': (
+        'fiftyTwoWeekHigh', 'fiftyTwoWeekLow', 'averageVolume', 'trailingPE',
+        'forwardPE', 'priceToSalesTrailing12Months', 'dividendYield', 'dividendRate',
+    ),
+    'defaultKeyStatistics': (
+        'enterpriseValue', 'sharesOutstanding', 'heldPercentInsiders',
+        'heldPercentInstitutions', 'priceToBook', 'beta', 'trailingEps',
+    ),
+}
+_QUOTE_SUMMARY_STATEMENT_MODULES = (
+    'incomeStatementHistory', 'balanceSheetHistory', 'cashflowStatementHistory',
+)
+# Only the statement modules are persisted: statements change at most
+# quarterly, so they can be reused across runs for much longer. Price and
+# info modules are never written to disk and live QUOTE_SUMMARY_TTL in memory.
+QUOTE_SUMMARY_DISK_TTL_HOURS = 6
+
+# Modules to request when the statements were served from disk
+_QUOTE_SUMMARY_INFO_MODULES = ",".join(_QUOTE_SUMMARY_INFO_FIELDS)
+
+# Minimum seconds between crumb handshakes after a failed one
+CRUMB_RETRY_INTERVAL = 30
+
+# Retry policy for throttled / transient Yahoo responses
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+MAX_ATTEMPTS = 5
+MAX_BACKOFF = 32  # seconds
+
+# In-memory cache lifetimes for the public fetchers
+INFO_CACHE_TTL = 300  # seconds
+PRICE_CACHE_TTL = 60  # seconds
+
+_quote_summary_locks: Dict[str, threading.Lock] = {}
+_quote_summary_guard = threading.Lock()
+
+# Request headers, one prebuilt dict per user agent
+_HEADER_POOL = tuple(
+    {
+        'User-Agent': ua,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+    }
+    for ua in USER_AGENTS
+)
+
 # Common US stock exchanges - symbols from these don't need suffix
 US_EXCHANGES = ['NYSE', 'NASDAQ', 'AMEX']
+_US_EXCHANGE_HINTS = frozenset(US_EXCHANGES + ['US'])
+_US_SYMBOL_RE = re.compile(r"[A-Z]{1,5}")
+
+class _TTLCache:
+    """Small thread-safe in-memory cache with per-entry expiry"""
+    
+    _MISSING = object()
+    
+    def __init__(self):
+        self._data: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return default
+            return value
+    
+    def set(self, key, value, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+def ttl_cached(ttl: float, negative_ttl: float = 10):
+    """Decorator memoizing a fetcher for `ttl` seconds, keyed by all arguments
+    
+    Failed lookups (None) are cached for `negative_ttl` seconds so an outage
+    doesn't turn into a stream of repeated requests. Calls passing
+    real_time=True bypass the cache.
+    """
+    def decorator(func):
+        cache = _TTLCache()
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if kwargs.get('real_time'):
+                return func(*args, **kwargs)
+            
+            key = (args, tuple(sorted(kwargs.items())))
+            result = cache.get(key)
+            if result is not _TTLCache._MISSING:
+                return result
+            
+            result = func(*args, **kwargs)
+            cache.set(key, result, ttl if result is not None else negative_ttl)
+            return result
+        
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+class _TokenBucket:
+    """Process-wide token bucket pacing outbound Yahoo requests
+    
+    The rate adapts AIMD-style: it is halved when more than 10% of the
+    responses seen in the last `window` seconds were 429s, and raised by
+    1 req/s (up to the configured rate) after each clean window.
+    """
+    
+    def __init__(self, rate: float, capacity: int, window: float = 60.0, min_rate: float = 0.5):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self.window = window
+        self.min_rate = min_rate
+        self._events = deque()  # (timestamp, was_throttled)
+        self._last_adjust = self.last
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+    
+    def reserve(self) -> float:
+        """Take one token and return how many seconds the caller must wait for it"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+    
+    def acquire(self) -> None:
+        """Block until a token is available"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+    
+    def record(self, status: int) -> None:
+        """Feed a response status into the adaptive rate control"""
+        with self._lock:
+            now = time.monotonic()
+            self._events.append((now, status == 429))
+            while self._events and now - self._events[0][0] > self.window:
+                self._events.popleft()
+            
+            throttled = sum(1 for _, hit in self._events if hit)
+            if throttled and throttled / len(self._events) > 0.10:
+                self._refill(now)
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._last_adjust = now
+                self._events.clear()
+                logger.warning(f"Yahoo throttling detected, pacing reduced to {self.rate:.2f} req/s")
+            elif not throttled and self.rate < self.base_rate and now - self._last_adjust >= self.window:
+                self._refill(now)
+                self.rate = min(self.base_rate, self.rate + 1.0)
+                self._last_adjust = now
+
+_YF_BUCKET = _TokenBucket(rate=5.0, capacity=10)
 
 # Session manager for Yahoo Finance with crumb authentication
 class YahooSession:
+    """Shared httpx.Client plus Yahoo crumb
+    
+    Invariants:
+    - `_state`/`_last_refresh`/`_last_attempt` are only written by
+      `_refresh_session`, which callers must invoke while holding `_lock`.
+    - `_state` is an immutable `(session, crumb)` tuple replaced in a single
+      assignment, so a lock-free reader never pairs a new session with an
+      old crumb.
+    - The `httpx.Client` is created once and kept for the life of the
+      process; refreshes only redo the cookie/crumb handshake on it, so no
+      connection pool is ever orphaned while readers may still hold it.
+    - `get_session` reads without the lock on the fast path and only takes
+      it (re-checking staleness) when a refresh looks necessary, so N
+      concurrent callers trigger at most one crumb handshake.
+    - A failed crumb handshake is not retried more often than every
+      CRUMB_RETRY_INTERVAL seconds.
+    """
     _instance = None
-    _session = None
-    _crumb = None
+    _state: Optional[Tuple[httpx.Client, Optional[str]]] = None
     _last_refresh = None
+    _last_attempt = None
+    _lock = threading.Lock()
+    
+    @classmethod
+    def _is_stale(cls, state, current_time: float) -> bool:
+        if state is None:
+            return True
+        if state[1] is None:
+            return cls._last_attempt is None or current_time - cls._last_attempt > CRUMB_RETRY_INTERVAL
+        # Refresh session every 15 minutes
+        return cls._last_refresh is not None and current_time - cls._last_refresh > 900
     
     @classmethod
     def get_session(cls):
         """Get or create a session with valid crumb"""
-        current_time = time.time()
+        state = cls._state
+        if cls._is_stale(state, time.time()):
+            with cls._lock:
+                # Another thread may have refreshed while we waited
+                state = cls._state
+                if cls._is_stale(state, time.time()):
+                    cls._refresh_session()
+                    state = cls._state
         
-        # Refresh session every 15 minutes
-        if cls._session is None or cls._crumb is None or \
-           (cls._last_refresh and current_time - cls._last_refresh > 900):
+        return state
+    
+    @classmethod
+    def refresh(cls):
+        """Force a session/crumb refresh (thread-safe)"""
+        with cls._lock:
             cls._refresh_session()
-        
-        return cls._session, cls._crumb
     
     @classmethod
     def _refresh_session(cls):
-        """Refresh the session and get a new crumb"""
-        cls._session = requests.Session()
-        headers = {
-            'User-Agent': random.choice(USER_AGENTS),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        }
-        cls._session.headers.update(headers)
+        """Refresh the session and get a new crumb (caller must hold _lock)"""
+        cls._last_attempt = time.time()
+        if cls._state is not None:
+            session = cls._state[0]
+        else:
+            # One pooled client for all sync fetchers; with h2 installed concurrent
+            # requests to query1.finance.yahoo.com multiplex over one connection
+            session = httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                timeout=15.0,
+                follow_redirects=True,
+                headers=_get_headers(),
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=100),
+            )
         
+        crumb = None
         try:
             # First, visit main page to get cookies
-            cls._session.get('https://finance.yahoo.com', timeout=10)
+            session.get('https://finance.yahoo.com', timeout=10)
             
             # Try to get crumb
             crumb_url = "https://query1.finance.yahoo.com/v1/test/getcrumb"
-            response = cls._session.get(crumb_url, timeout=10)
+            response = session.get(crumb_url, timeout=10)
             
             if response.status_code == 200:
-                cls._crumb = response.text
-                logger.info(f"Got Yahoo crumb: {cls._crumb[:10]}...")
+                crumb = response.text
+                logger.info(f"Got Yahoo crumb: {crumb[:10]}...")
             else:
                 logger.warning(f"Failed to get crumb: {response.status_code}")
-                cls._crumb = None
             
             cls._last_refresh = time.time()
         except Exception as e:
             logger.error(f"Failed to refresh Yahoo session: {e}")
-            cls._crumb = None
+        
+        # Publish the session and its new crumb in one step
+        cls._state = (session, crumb)
+
+def warmup() -> None:
+    """Establish the Yahoo session and crumb ahead of the first data request"""
+    YahooSession.get_session()
+
+_keepalive_thread: Optional[threading.Thread] = None
+
+def start_session_keepalive(interval: float = 720) -> None:
+    """Re-handshake the crumb in a daemon thread every `interval` seconds
+    
+    Runs ahead of the 15-minute staleness window so get_session never has
+    to refresh on an inbound request. Safe to call more than once.
+    """
+    global _keepalive_thread
+    if _keepalive_thread is not None and _keepalive_thread.is_alive():
+        return
+    
+    def _loop():
+        while True:
+            time.sleep(interval)
+            try:
+                YahooSession.refresh()
+            except Exception as e:
+                logger.error(f"Background Yahoo session refresh failed: {e}")
+    
+    _keepalive_thread = threading.Thread(target=_loop, name="yahoo-session-keepalive", daemon=True)
+    _keepalive_thread.start()
 
 def _is_us_stock(symbol: str) -> bool:
     """Check if symbol is likely a US stock (no suffix needed)"""
-    # If already has a suffix like .NS, .BO, .L, etc., it's not a plain US stock
-    if '.' in symbol:
-        return False
+    # If already has a suffix like .NS, .BO, .L, etc., it's not a plain US stock.
     # US stocks are typically 1-5 uppercase letters without suffix
-    # Common indicators: no numbers, all caps, short length
-    return symbol.isalpha() and symbol.isupper() and len(symbol) <= 5
+    return '.' not in symbol and _US_SYMBOL_RE.fullmatch(symbol) is not None
 
+@functools.lru_cache(maxsize=4096)
 def _format_symbol(symbol: str, exchange: str = None) -> str:
     """Format symbol with appropriate suffix based on exchange"""
     # If already has a suffix, return as-is
     if '.' in symbol:
         return symbol
     
+    ex = exchange.upper() if exchange else None
+    
     # If exchange is specified as US-based, return without suffix
-    if exchange and exchange.upper() in ['NYSE', 'NASDAQ', 'AMEX', 'US']:
+    if ex in _US_EXCHANGE_HINTS:
         return symbol
     
     # If exchange is Indian, add appropriate suffix
-    if exchange and exchange.upper() in ['NSE', 'BSE']:
-        return f"{symbol}.NS" if exchange.upper() == 'NSE' else f"{symbol}.BO"
+    if ex == 'NSE':
+        return f"{symbol}.NS"
+    if ex == 'BSE':
+        return f"{symbol}.BO"
     
     # Try to auto-detect: if it looks like a US stock, don't add suffix
     # Otherwise default to Indian NSE
@@ -103,46 +391,79 @@ def _format_symbol(symbol: str, exchange: str = None) -> str:
     
     return f"{symbol}.NS"
 
-def _get_headers():
-    return {
-        'User-Agent': random.choice(USER_AGENTS),
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-    }
+def _get_headers() -> Dict[str, str]:
+    """Pick one of the prebuilt header dicts (shared - copy before mutating)"""
+    return _HEADER_POOL[random.randrange(len(_HEADER_POOL))]
+
+def _parse_json(response) -> Any:
+    """Decode a requests/httpx response body, preferring orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+def _with_crumb(url: str, crumb: Optional[str]) -> str:
+    """Append the crumb query parameter to a URL if we have one"""
+    if not crumb:
+        return url
+    separator = '&' if '?' in url else '?'
+    return f"{url}{separator}crumb={crumb}"
+
+def _backoff_delay(response: httpx.Response, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying a throttled/failed response, or None to give up
+    
+    Honors Retry-After (seconds form) when present, otherwise exponential
+    backoff with jitter capped at MAX_BACKOFF.
+    """
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            delay = None  # HTTP-date form, fall back to exponential backoff
+        if delay is not None:
+            # Server wants us to wait longer than we are willing to block
+            return delay if delay <= MAX_BACKOFF else None
+    return min(MAX_BACKOFF, (2 ** attempt) + random.random())
 
-def _make_yahoo_request(url: str, timeout: int = 15) -> Optional[requests.Response]:
-    """Make a request to Yahoo Finance with session and crumb"""
+def _make_yahoo_request(url: str, timeout: int = 15) -> Optional[httpx.Response]:
+    """Make a request to Yahoo Finance with session and crumb
+    
+    Retries 429/5xx responses with backoff (up to MAX_ATTEMPTS total) and
+    refreshes the session once on 401.
+    """
     try:
         session, crumb = YahooSession.get_session()
+        refreshed = False
+        response = None
         
-        # Add crumb if available
-        if crumb:
-            separator = '&' if '?' in url else '?'
-            url = f"{url}{separator}crumb={crumb}"
-        
-        response = session.get(url, timeout=timeout)
-        
-        # If unauthorized, refresh session and retry
-        if response.status_code == 401:
-            logger.info("Session expired, refreshing...")
-            YahooSession._refresh_session()
-            session, crumb = YahooSession.get_session()
-            if crumb:
-                # Rebuild URL with new crumb
-                base_url = url.split('crumb=')[0].rstrip('&?')
-                separator = '&' if '?' in base_url else '?'
-                url = f"{base_url}{separator}crumb={crumb}"
-            response = session.get(url, timeout=timeout)
+        for attempt in range(MAX_ATTEMPTS):
+            _YF_BUCKET.acquire()
+            response = session.get(_with_crumb(url, crumb), timeout=timeout)
+            status = response.status_code
+            _YF_BUCKET.record(status)
+            
+            # If unauthorized, refresh session and retry
+            if status == 401 and not refreshed:
+                logger.info("Session expired, refreshing...")
+                YahooSession.refresh()
+                session, crumb = YahooSession.get_session()
+                refreshed = True
+                continue
+            
+            if status in RETRYABLE_STATUS and attempt < MAX_ATTEMPTS - 1:
+                delay = _backoff_delay(response, attempt)
+                if delay is None:
+                    return response
+                logger.debug(f"Yahoo returned {status}, retrying in {delay:.1f}s (attempt {attempt + 1}/{MAX_ATTEMPTS})")
+                time.sleep(delay)
+                continue
+            
+            return response
         
         return response
     except Exception as e:
         logger.error(f"Yahoo request failed: {e}")
-        # Fallback to simple request without session
-        try:
-            return requests.get(url.split('crumb=')[0].rstrip('&?'), 
-                              headers=_get_headers(), timeout=timeout)
-        except:
-            return None
+        return None
 
 def _get_basic_info_from_chart(symbol: str, exchange: str = None) -> Optional[Dict[str, Any]]:
     """Fallback: Get basic stock info from Chart API which doesn't require auth"""
@@ -150,53 +471,184 @@ def _get_basic_info_from_chart(symbol: str, exchange: str = None) -> Optional[Di
         formatted_symbol = _format_symbol(symbol, exchange)
         url = f"{CHART_URL}{formatted_symbol}?range=1d&interval=1d"
         
-        response = requests.get(url, headers=_get_headers(), timeout=15)
-        if response.status_code != 200:
-            return None
-        
-        data = response.json()
-        chart_result = data.get('chart', {}).get('result', [{}])
-        if not chart_result:
+        response = _make_yahoo_request(url, timeout=15)
+        if not response or response.status_code != 200:
             return None
         
-        meta = chart_result[0].get('meta', {})
-        
-        # Get latest price
-        indicators = chart_result[0].get('indicators', {})
-        quote = indicators.get('quote', [{}])[0] if indicators else {}
-        closes = quote.get('close', [])
-        current_price = closes[-1] if closes else meta.get('regularMarketPrice', 0)
-        
-        return {
-            "symbol": meta.get('symbol', symbol).replace('.NS', '').replace('.BO', ''),
-            "name": meta.get('shortName', meta.get('longName', symbol)),
-            "currency": meta.get('currency', 'USD'),
-            "exchange": meta.get('exchangeName', exchange or 'Unknown'),
-            "current_price": current_price,
-            "previous_close": meta.get('chartPreviousClose', 0),
-            "regular_market_price": meta.get('regularMarketPrice', current_price),
-            # Mark as basic info only
-            "_source": "chart_api"
-        }
+        return _parse_chart_basic_info(_parse_json(response), symbol, exchange)
     except Exception as e:
         logger.error(f"Chart API fallback failed for {symbol}: {e}")
         return None
 
+def _parse_chart_basic_info(data: Dict[str, Any], symbol: str, exchange: str = None) -> Optional[Dict[str, Any]]:
+    """Map a Chart API payload to the basic info structure"""
+    chart_result = data.get('chart', {}).get('result', [{}])
+    if not chart_result:
+        return None
+    
+    meta = chart_result[0].get('meta', {})
+    
+    # Get latest price
+    indicators = chart_result[0].get('indicators', {})
+    quote = indicators.get('quote', [{}])[0] if indicators else {}
+    closes = quote.get('close', [])
+    current_price = closes[-1] if closes else meta.get('regularMarketPrice', 0)
+    
+    return {
+        "symbol": meta.get('symbol', symbol).replace('.NS', '').replace('.BO', ''),
+        "name": meta.get('shortName', meta.get('longName', symbol)),
+        "currency": meta.get('currency', 'USD'),
+        "exchange": meta.get('exchangeName', exchange or 'Unknown'),
+        "current_price": current_price,
+        "previous_close": meta.get('chartPreviousClose', 0),
+        "regular_market_price": meta.get('regularMarketPrice', current_price),
+        # Mark as basic info only
+        "_source": "chart_api"
+    }
+
+_quote_summary_cache = _TTLCache()
+
+def _load_statements_from_disk(symbol: str) -> Optional[Dict[str, Any]]:
+    """Read persisted statement modules for a symbol (None on miss or cache error)"""
+    if not DISK_CACHE_AVAILABLE:
+        return None
+    try:
+        return get_cached(f"yahoo:quote_summary_statements:{symbol}")
+    except Exception as e:
+        logger.debug(f"Disk cache read failed for {symbol}: {e}")
+        return None
+
+def _save_statements_to_disk(symbol: str, result: Dict[str, Any]) -> None:
+    """Persist the statement modules of a quoteSummary result, ignoring cache errors"""
+    if not DISK_CACHE_AVAILABLE:
+        return
+    statements = {m: result[m] for m in _QUOTE_SUMMARY_STATEMENT_MODULES if m in result}
+    try:
+        set_cached(f"yahoo:quote_summary_statements:{symbol}", statements, ttl_hours=QUOTE_SUMMARY_DISK_TTL_HOURS)
+    except Exception as e:
+        logger.debug(f"Disk cache write failed for {symbol}: {e}")
+
+def _quote_summary_url(symbol: str, statements: Optional[Dict[str, Any]]) -> str:
+    """quoteSummary URL, skipping the statement modules when they came from disk"""
+    modules = QUOTE_SUMMARY_MODULES if statements is None else _QUOTE_SUMMARY_INFO_MODULES
+    return f"{BASE_URL}{symbol}?modules={modules}"
+
+def _merge_quote_summary(symbol: str, result: Optional[Dict[str, Any]],
+                         statements: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Combine fresh info modules with disk statements and memoize the result"""
+    if result is None:
+        return None
+    if statements is not None:
+        result.update(statements)
+    _quote_summary_cache.set(symbol, result, QUOTE_SUMMARY_TTL)
+    return result
+
+def _fetch_quote_summary(symbol: str, real_time: bool = False) -> Optional[Dict[str, Any]]:
+    """Fetch every quoteSummary module we use for a formatted symbol in one request
+    
+    The parsed result is memoized for a short TTL so get_stock_info and
+    get_historical_financials share a single round-trip. A per-symbol lock
+    makes concurrent callers wait for the in-flight request instead of
+    issuing their own. Statement modules are also persisted to disk, so a
+    repeat run only requests the price/info modules. Pass real_time=True to
+    skip the in-memory result and always fetch current prices.
+    """
+    with _quote_summary_guard:
+        lock = _quote_summary_locks.setdefault(symbol, threading.Lock())
+    
+    with lock:
+        if not real_time:
+            cached = _quote_summary_cache.get(symbol, None)
+            if cached is not None:
+                return cached
+        
+        statements = _load_statements_from_disk(symbol)
+        response = _make_yahoo_request(_quote_summary_url(symbol, statements), timeout=15)
+        if not response or response.status_code != 200:
+            logger.warning(f"Yahoo QuoteSummary API returned status {response.status_code if response else 'None'} for {symbol}")
+            return None
+        
+        result = _extract_quote_summary(_parse_json(response), symbol)
+        if result is not None and statements is None:
+            _save_statements_to_disk(symbol, result)
+        return _merge_quote_summary(symbol, result, statements)
+
+def _extract_quote_summary(data: Dict[str, Any], symbol: str) -> Optional[Dict[str, Any]]:
+    """Pull the single result dict out of a quoteSummary payload, pruned to the fields we read"""
+    if 'quoteSummary' not in data or not data['quoteSummary']['result']:
+        logger.info(f"No quoteSummary data for {symbol}")
+        return None
+    return _prune_quote_summary(data['quoteSummary']['result'][0])
+
+def _prune_quote_summary(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop every quoteSummary field the parsers never read
+    
+    The payload carries a couple of hundred fields per module (each with
+    raw/fmt/longFmt variants); keeping only the whitelisted leaves shrinks
+    what the in-memory and on-disk caches hold and re-serialize.
+    """
+    pruned = {}
+    for module, fields in _QUOTE_SUMMARY_INFO_FIELDS.items():
+        mod = result.get(module)
+        if not mod:
+            continue
+        pruned[module] = {
+            k: ({'raw': mod[k]['raw']} if isinstance(mod[k], dict) else mod[k])
+            for k in fields
+            if k in mod and (not isinstance(mod[k], dict) or 'raw' in mod[k])
+        }
+    
+    for module in _QUOTE_SUMMARY_STATEMENT_MODULES:
+        list_key = module.replace('History', 'Statements')
+        history = result.get(module, {}).get(list_key)
+        if not history:
+            continue
+        pruned[module] = {list_key: [
+            dict(
+                {k: {'raw': v['raw']} for k, v in item.items() if isinstance(v, dict) and 'raw' in v},
+                endDate={'fmt': item.get('endDate', {}).get('fmt', '')},
+            )
+            for item in history
+        ]}
+    return pruned
+
 class YahooFinanceCollector:
     """Class to fetch data from Yahoo Finance without yfinance"""
     
-    def __init__(self, symbol: str, exchange: str = None):
+    def __init__(self, symbol: str, exchange: str = None, real_time: bool = False):
         self.symbol = symbol
         self.exchange = exchange
+        # Skip the in-memory quoteSummary result so prices are always current
+        self.real_time = real_time
         # Use the new _format_symbol helper for proper US/Indian stock handling
         self.ticker_symbol = _format_symbol(symbol, exchange)
             
-    def get_data(self) -> Dict[str, Any]:
-        """Get all available data for the symbol"""
-        # Pass exchange to helper functions for proper symbol formatting
-        info = get_stock_info(self.symbol, self.exchange)
-        financials = get_historical_financials(self.symbol, exchange=self.exchange)
-        price_history = get_price_history(self.symbol, exchange=self.exchange)
+    async def aget_data(self, client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
+        """Get all available data for the symbol
+        
+        The quoteSummary and chart requests are independent, so they are
+        issued concurrently on one AsyncClient. Pass `client` to share a
+        connection pool across many tickers.
+        """
+        if client is None:
+            async with await _open_async_client() as own_client:
+                return await self.aget_data(client=own_client)
+        
+        # Info and financials are both projected from one quoteSummary response
+        summary, price_history = await asyncio.gather(
+            _a_fetch_quote_summary(client, self.ticker_symbol, real_time=self.real_time),
+            aget_price_history(self.symbol, exchange=self.exchange, client=client),
+        )
+        
+        info, financials = None, None
+        if summary:
+            try:
+                info = _parse_stock_info(summary, self.ticker_symbol)
+                financials = _parse_financials(summary)
+            except Exception as e:
+                logger.error(f"Error parsing quoteSummary for {self.ticker_symbol}: {e}")
+        if not info:
+            info = await _a_get_basic_info_from_chart(client, self.symbol, self.exchange)
         
         return {
             "company_info": info if info else {},
@@ -207,17 +659,33 @@ class YahooFinanceCollector:
             "balance_sheet": financials.get('balance_sheet', {}) if financials else {},
             "cash_flow": financials.get('cash_flow', {}) if financials else {},
         }
+    
+    def get_data(self) -> Dict[str, Any]:
+        """Synchronous wrapper around aget_data
+        
+        asyncio.run refuses to nest inside a running event loop, so when one is
+        active in this thread the fetch runs on its own loop in a worker thread
+        (still blocking the caller, as the old sync implementation did).
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aget_data())
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, self.aget_data()).result()
 
-async def fetch_stock_data(symbol: str, exchange: str = "NSE") -> Dict[str, Any]:
-    collector = YahooFinanceCollector(symbol, exchange)
-    return collector.get_data()
+async def fetch_stock_data(symbol: str, exchange: str = "NSE", real_time: bool = False) -> Dict[str, Any]:
+    collector = YahooFinanceCollector(symbol, exchange, real_time=real_time)
+    return await collector.aget_data()
 
-def get_stock_info(symbol: str, exchange: str = None) -> Optional[Dict[str, Any]]:
+@ttl_cached(ttl=INFO_CACHE_TTL)
+def get_stock_info(symbol: str, exchange: str = None, real_time: bool = False) -> Optional[Dict[str, Any]]:
     """Fetch basic stock info directly from Yahoo API
     
     Args:
         symbol: Stock symbol (e.g., AAPL for US, RELIANCE for India)
         exchange: Optional exchange hint (NYSE, NASDAQ, NSE, BSE)
+        real_time: Bypass the info caches and fetch current prices
     """
     original_symbol = symbol
     try:
@@ -225,79 +693,19 @@ def get_stock_info(symbol: str, exchange: str = None) -> Optional[Dict[str, Any]
         formatted_symbol = _format_symbol(symbol, exchange)
         symbol = formatted_symbol
             
-        modules = "financialData,quoteType,summaryDetail,price,defaultKeyStatistics,summaryProfile"
-        url = f"{BASE_URL}{symbol}?modules={modules}"
-        
-        response = _make_yahoo_request(url, timeout=15)
-        if not response or response.status_code != 200:
+        result = _fetch_quote_summary(symbol, real_time=real_time)
+        if not result:
             logger.warning(f"Yahoo QuoteSummary API failed for {symbol}, trying chart API fallback...")
             # Try chart API fallback
             return _get_basic_info_from_chart(original_symbol, exchange)
         
-        data = response.json()
-        
-        if 'quoteSummary' not in data or not data['quoteSummary']['result']:
-            # Try chart API fallback
-            logger.info(f"No quoteSummary data for {symbol}, trying chart API fallback...")
-            return _get_basic_info_from_chart(original_symbol, exchange)
-            
-        result = data['quoteSummary']['result'][0]
-        
-        # Helper to safely get nested values
-        def get_v(module, key, default=0):
-            return result.get(module, {}).get(key, {}).get('raw', default)
-
-        # Map to common structure
-        info = {
-            "symbol": symbol.replace('.NS', '').replace('.BO', ''),
-            "name": result.get('price', {}).get('longName', symbol),
-            "sector": result.get('summaryProfile', {}).get('sector', 'Unknown'),
-            "industry": result.get('summaryProfile', {}).get('industry', 'Unknown'),
-            "website": result.get('summaryProfile', {}).get('website', ''),
-            "description": result.get('summaryProfile', {}).get('longBusinessSummary', ''),
-            
-            "market_cap": get_v('price', 'marketCap') / 10000000,
-            "enterprise_value": get_v('defaultKeyStatistics', 'enterpriseValue') / 10000000,
-            "current_price": get_v('financialData', 'currentPrice'),
-            "52_week_high": get_v('summaryDetail', 'fiftyTwoWeekHigh'),
-            "52_week_low": get_v('summaryDetail', 'fiftyTwoWeekLow'),
-            "avg_volume": get_v('summaryDetail', 'averageVolume'),
-            
-            "shares_outstanding": get_v('defaultKeyStatistics', 'sharesOutstanding') / 10000000,
-            "held_percent_insiders": get_v('defaultKeyStatistics', 'heldPercentInsiders'),
-            "held_percent_institutions": get_v('defaultKeyStatistics', 'heldPercentInstitutions'),
-            
-            "pe_ratio": get_v('summaryDetail', 'trailingPE'),
-            "forward_pe": get_v('summaryDetail', 'forwardPE'),
-            "pb_ratio": get_v('defaultKeyStatistics', 'priceToBook'),
-            "ps_ratio": get_v('summaryDetail', 'priceToSalesTrailing12Months'),
-            
-            "beta": get_v('defaultKeyStatistics', 'beta', 1.0),
-            
-            "profit_margin": get_v('financialData', 'profitMargins'),
-            "operating_margin": get_v('financialData', 'operatingMargins'),
-            "return_on_equity": get_v('financialData', 'returnOnEquity'),
-            "return_on_assets": get_v('financialData', 'returnOnAssets'),
-            
-            "total_revenue": get_v('financialData', 'totalRevenue') / 10000000,
-            "revenue_growth": get_v('financialData', 'revenueGrowth'),
-            "ebitda": get_v('financialData', 'ebitda') / 10000000,
-            "total_debt": get_v('financialData', 'totalDebt') / 10000000,
-            "total_cash": get_v('financialData', 'totalCash') / 10000000,
-            "free_cash_flow": get_v('financialData', 'freeCashflow') / 10000000,
-            "earnings_per_share": get_v('defaultKeyStatistics', 'trailingEps'),
-            
-            "dividend_yield": get_v('summaryDetail', 'dividendYield'),
-            "dividend_rate": get_v('summaryDetail', 'dividendRate'),
-            "debt_to_equity": get_v('financialData', 'debtToEquity'),
-            "current_ratio": get_v('financialData', 'currentRatio'),
-        }
-        return info
+        return _parse_stock_info(result, symbol)
     except Exception as e:
         logger.error(f"Error in get_stock_info for {symbol}: {e}")
         # Try chart API fallback on exception
         return _get_basic_info_from_chart(original_symbol, exchange)
 
+@ttl_cached(ttl=INFO_CACHE_TTL)
 def get_historical_financials(symbol: str, years: int = 5, exchange: str = None) -> Optional[Dict[str, Any]]:
     """Fetch historical financials from Yahoo API
     
@@ -311,83 +719,16 @@ def get_historical_financials(symbol: str, years: int = 5, exchange: str = None)
         formatted_symbol = _format_symbol(symbol, exchange)
         symbol = formatted_symbol
 
-        modules = "incomeStatementHistory,balanceSheetHistory,cashflowStatementHistory"
-        url = f"{BASE_URL}{symbol}?modules={modules}"
-        
-        response = _make_yahoo_request(url, timeout=15)
-        if not response or response.status_code != 200:
-            logger.warning(f"Yahoo API returned status {response.status_code if response else 'None'} for {symbol} financials")
+        result = _fetch_quote_summary(symbol)
+        if not result:
             return None
         
-        data = response.json()
-        
-        if 'quoteSummary' not in data or not data['quoteSummary']['result']:
-            return None
-            
-        result = data['quoteSummary']['result'][0]
-        
-        def parse_statement(module_name):
-            stmt_data = {}
-            history = result.get(module_name, {}).get(module_name.replace('History', 'Statements'), [])
-            for item in history:
-                date = item.get('endDate', {}).get('fmt', '')[:4]
-                if not date: continue
-                
-                vals = {}
-                for k, v in item.items():
-                    if isinstance(v, dict) and 'raw' in v:
-                        vals[k] = v['raw'] / 10000000 # To Crores
-                stmt_data[date] = vals
-            return stmt_data
-
-        income_stmt = parse_statement('incomeStatementHistory')
-        balance_sheet = parse_statement('balanceSheetHistory')
-        cash_flow = parse_statement('cashflowStatementHistory')
-        
-        # Normalize keys for the engine
-        normalized_income = {}
-        for yr, vals in income_stmt.items():
-            normalized_income[yr] = {
-                "revenue": vals.get('totalRevenue', 0),
-                "gross_profit": vals.get('grossProfit', 0),
-                "ebitda": vals.get('ebitda', 0),
-                "operating_income": vals.get('operatingIncome', 0),
-                "net_income": vals.get('netIncome', 0),
-                "interest_expense": vals.get('interestExpense', 0),
-                "tax_expense": vals.get('incomeTaxExpense', 0),
-            }
-
-        normalized_balance = {}
-        for yr, vals in balance_sheet.items():
-            normalized_balance[yr] = {
-                "total_assets": vals.get('totalAssets', 0),
-                "total_liabilities": vals.get('totalLiab', 0),
-                "total_equity": vals.get('totalStockholderEquity', 0),
-                "cash": vals.get('cash', 0),
-                "total_debt": vals.get('longTermDebt', 0) + vals.get('shortLongTermDebt', 0),
-                "current_assets": vals.get('totalCurrentAssets', 0),
-                "current_liabilities": vals.get('totalCurrentLiabilities', 0),
-            }
-
-        normalized_cash = {}
-        for yr, vals in cash_flow.items():
-            normalized_cash[yr] = {
-                "operating_cash_flow": vals.get('totalCashFromOperatingActivities', 0),
-                "capex": abs(vals.get('capitalExpenditures', 0)),
-                "depreciation": vals.get('depreciation', 0),
-                "free_cash_flow": vals.get('totalCashFromOperatingActivities', 0) + vals.get('capitalExpenditures', 0),
-            }
-
-        return {
-            "income_statement": normalized_income,
-            "balance_sheet": normalized_balance,
-            "cash_flow": normalized_cash,
-            "years_available": len(normalized_income),
-        }
+        return _parse_financials(result)
     except Exception as e:
         logger.error(f"Error in get_historical_financials for {symbol}: {e}")
         return None
 
+@ttl_cached(ttl=PRICE_CACHE_TTL)
 def get_price_history(symbol: str, period: str = "5y", exchange: str = None) -> Optional[Dict[str, Any]]:
     """Fetch price history using Chart API
     
@@ -401,103 +742,471 @@ def get_price_history(symbol: str, period: str = "5y", exchange: str = None) ->
         formatted_symbol = _format_symbol(symbol, exchange)
         symbol = formatted_symbol
             
-        # Map period to YF range
-        range_map = {"1y": "1y", "2y": "2y", "5y": "5y", "10y": "10y", "max": "max"}
-        r = range_map.get(period, "5y")
-        
-        url = f"{CHART_URL}{symbol}?range={r}&interval=1d"
+        url = _price_history_url(symbol, period)
         response = _make_yahoo_request(url, timeout=15)
         if not response or response.status_code != 200:
             logger.warning(f"Yahoo Chart API returned status {response.status_code if response else 'None'} for {symbol}")
             return None
         
-        data = response.json()
+        return _parse_price_history(_parse_json(response))
+    except Exception as e:
+        logger.error(f"Error in get_price_history for {symbol}: {e}")
+        return None
+
+# ---------------------------------------------------------------------------
+# Async fetch layer (httpx) - lets batch callers fan out many tickers on one
+# event loop instead of one blocking thread per request.
+# ---------------------------------------------------------------------------
+
+async def _open_async_client() -> httpx.AsyncClient:
+    """Create an AsyncClient sharing the YahooSession cookies and headers"""
+    session, _ = await asyncio.to_thread(YahooSession.get_session)
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=15,
+        headers=dict(session.headers),
+        cookies=session.cookies,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+    )
+
+async def _a_make_yahoo_request(client: httpx.AsyncClient, url: str) -> Optional[httpx.Response]:
+    """Async counterpart of _make_yahoo_request (same retry/refresh policy)"""
+    try:
+        session, crumb = await asyncio.to_thread(YahooSession.get_session)
+        refreshed = False
+        response = None
+        
+        for attempt in range(MAX_ATTEMPTS):
+            wait = _YF_BUCKET.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            response = await client.get(_with_crumb(url, crumb))
+            status = response.status_code
+            _YF_BUCKET.record(status)
+            
+            # If unauthorized, refresh session and retry
+            if status == 401 and not refreshed:
+                logger.info("Session expired, refreshing...")
+                await asyncio.to_thread(YahooSession.refresh)
+                session, crumb = await asyncio.to_thread(YahooSession.get_session)
+                client.cookies = session.cookies
+                refreshed = True
+                continue
+            
+            if status in RETRYABLE_STATUS and attempt < MAX_ATTEMPTS - 1:
+                delay = _backoff_delay(response, attempt)
+                if delay is None:
+                    return response
+                logger.debug(f"Yahoo returned {status}, retrying in {delay:.1f}s (attempt {attempt + 1}/{MAX_ATTEMPTS})")
+                await asyncio.sleep(delay)
+                continue
+            
+            return response
         
-        chart = data.get('chart', {}).get('result', [{}])[0]
-        if not chart: return None
+        return response
+    except Exception as e:
+        logger.error(f"Yahoo async request failed: {e}")
+        return None
+
+async def _a_fetch_quote_summary(client: httpx.AsyncClient, symbol: str, real_time: bool = False) -> Optional[Dict[str, Any]]:
+    """Async counterpart of _fetch_quote_summary (shares its TTL and disk caches)"""
+    if not real_time:
+        cached = _quote_summary_cache.get(symbol, None)
+        if cached is not None:
+            return cached
+    
+    statements = await asyncio.to_thread(_load_statements_from_disk, symbol)
+    response = await _a_make_yahoo_request(client, _quote_summary_url(symbol, statements))
+    if not response or response.status_code != 200:
+        logger.warning(f"Yahoo QuoteSummary API returned status {response.status_code if response else 'None'} for {symbol}")
+        return None
+    
+    result = _extract_quote_summary(_parse_json(response), symbol)
+    if result is not None and statements is None:
+        await asyncio.to_thread(_save_statements_to_disk, symbol, result)
+    return _merge_quote_summary(symbol, result, statements)
+
+async def _a_get_basic_info_from_chart(client: httpx.AsyncClient, symbol: str, exchange: str = None) -> Optional[Dict[str, Any]]:
+    """Async counterpart of _get_basic_info_from_chart"""
+    try:
+        formatted_symbol = _format_symbol(symbol, exchange)
+        url = f"{CHART_URL}{formatted_symbol}?range=1d&interval=1d"
         
-        closes = chart.get('indicators', {}).get('quote', [{}])[0].get('close', [])
-        closes = [c for c in closes if c is not None]
+        response = await _a_make_yahoo_request(client, url)
+        if not response or response.status_code != 200:
+            return None
         
+        return _parse_chart_basic_info(_parse_json(response), symbol, exchange)
+    except Exception as e:
+        logger.error(f"Chart API fallback failed for {symbol}: {e}")
+        return None
+
+async def aget_stock_info(symbol: str, exchange: str = None, client: Optional[httpx.AsyncClient] = None,
+                          real_time: bool = False) -> Optional[Dict[str, Any]]:
+    """Async version of get_stock_info
+    
+    Args:
+        symbol: Stock symbol (e.g., AAPL for US, RELIANCE for India)
+        exchange: Optional exchange hint (NYSE, NASDAQ, NSE, BSE)
+        client: Optional shared AsyncClient; a temporary one is opened if omitted
+        real_time: Bypass the in-memory quoteSummary result and fetch current prices
+    """
+    if client is None:
+        async with await _open_async_client() as own_client:
+            return await aget_stock_info(symbol, exchange, client=own_client, real_time=real_time)
+    
+    formatted_symbol = _format_symbol(symbol, exchange)
+    try:
+        result = await _a_fetch_quote_summary(client, formatted_symbol, real_time=real_time)
+        if result:
+            return _parse_stock_info(result, formatted_symbol)
+        logger.warning(f"Yahoo QuoteSummary API failed for {formatted_symbol}, trying chart API fallback...")
+    except Exception as e:
+        logger.error(f"Error in aget_stock_info for {formatted_symbol}: {e}")
+    # Try chart API fallback
+    return await _a_get_basic_info_from_chart(client, symbol, exchange)
+
+async def aget_historical_financials(symbol: str, years: int = 5, exchange: str = None,
+                                     client: Optional[httpx.AsyncClient] = None) -> Optional[Dict[str, Any]]:
+    """Async version of get_historical_financials
+    
+    Args:
+        symbol: Stock symbol
+        years: Number of years of data
+        exchange: Optional exchange hint (NYSE, NASDAQ, NSE, BSE)
+        client: Optional shared AsyncClient; a temporary one is opened if omitted
+    """
+    if client is None:
+        async with await _open_async_client() as own_client:
+            return await aget_historical_financials(symbol, years, exchange, client=own_client)
+    
+    formatted_symbol = _format_symbol(symbol, exchange)
+    try:
+        result = await _a_fetch_quote_summary(client, formatted_symbol)
+        if not result:
+            return None
+        return _parse_financials(result)
+    except Exception as e:
+        logger.error(f"Error in aget_historical_financials for {formatted_symbol}: {e}")
+        return None
+
+async def aget_price_history(symbol: str, period: str = "5y", exchange: str = None,
+                             client: Optional[httpx.AsyncClient] = None) -> Optional[Dict[str, Any]]:
+    """Async version of get_price_history
+    
+    Args:
+        symbol: Stock symbol
+        period: Time period (1y, 2y, 5y, 10y, max)
+        exchange: Optional exchange hint (NYSE, NASDAQ, NSE, BSE)
+        client: Optional shared AsyncClient; a temporary one is opened if omitted
+    """
+    if client is None:
+        async with await _open_async_client() as own_client:
+            return await aget_price_history(symbol, period, exchange, client=own_client)
+    
+    formatted_symbol = _format_symbol(symbol, exchange)
+    try:
+        response = await _a_make_yahoo_request(client, _price_history_url(formatted_symbol, period))
+        if not response or response.status_code != 200:
+            logger.warning(f"Yahoo Chart API returned status {response.status_code if response else 'None'} for {formatted_symbol}")
+            return None
+        return _parse_price_history(_parse_json(response))
+    except Exception as e:
+        logger.error(f"Error in aget_price_history for {formatted_symbol}: {e}")
+        return None
+
+def _parse_stock_info(result: Dict[str, Any], symbol: str) -> Dict[str, Any]:
+    """Map a quoteSummary result to the common stock info structure"""
+    # Helper to safely get nested values
+    def get_v(module, key, default=0):
+        return result.get(module, {}).get(key, {}).get('raw', default)
+
+    # Map to common structure
+    info = {
+        "symbol": symbol.replace('.NS', '').replace('.BO', ''),
+        "name": result.get('price', {}).get('longName', symbol),
+        "sector": result.get('summaryProfile', {}).get('sector', 'Unknown'),
+        "industry": result.get('summaryProfile', {}).get('industry', 'Unknown'),
+        "website": result.get('summaryProfile', {}).get('website', ''),
+        "description": result.get('summaryProfile', {}).get('longBusinessSummary', ''),
+        
+        "market_cap": get_v('price', 'marketCap') / 10000000,
+        "enterprise_value": get_v('defaultKeyStatistics', 'enterpriseValue') / 10000000,
+        "current_price": get_v('financialData', 'currentPrice'),
+        "52_week_high": get_v('summaryDetail', 'fiftyTwoWeekHigh'),
+        "52_week_low": get_v('summaryDetail', 'fiftyTwoWeekLow'),
+        "avg_volume": get_v('summaryDetail', 'averageVolume'),
+        
+        "shares_outstanding": get_v('defaultKeyStatistics', 'sharesOutstanding') / 10000000,
+        "held_percent_insiders": get_v('defaultKeyStatistics', 'heldPercentInsiders'),
+        "held_percent_institutions": get_v('defaultKeyStatistics', 'heldPercentInstitutions'),
+        
+        "pe_ratio": get_v('summaryDetail', 'trailingPE'),
+        "forward_pe": get_v('summaryDetail', 'forwardPE'),
+        "pb_ratio": get_v('defaultKeyStatistics', 'priceToBook'),
+        "ps_ratio": get_v('summaryDetail', 'priceToSalesTrailing12Months'),
+        
+        "beta": get_v('defaultKeyStatistics', 'beta', 1.0),
+        
+        "profit_margin": get_v('financialData', 'profitMargins'),
+        "operating_margin": get_v('financialData', 'operatingMargins'),
+        "return_on_equity": get_v('financialData', 'returnOnEquity'),
+        "return_on_assets": get_v('financialData', 'returnOnAssets'),
+        
+        "total_revenue": get_v('financialData', 'totalRevenue') / 10000000,
+        "revenue_growth": get_v('financialData', 'revenueGrowth'),
+        "ebitda": get_v('financialData', 'ebitda') / 10000000,
+        "total_debt": get_v('financialData', 'totalDebt') / 10000000,
+        "total_cash": get_v('financialData', 'totalCash') / 10000000,
+        "free_cash_flow": get_v('financialData', 'freeCashflow') / 10000000,
+        "earnings_per_share": get_v('defaultKeyStatistics', 'trailingEps'),
+        
+        "dividend_yield": get_v('summaryDetail', 'dividendYield'),
+        "dividend_rate": get_v('summaryDetail', 'dividendRate'),
+        "debt_to_equity": get_v('financialData', 'debtToEquity'),
+        "current_ratio": get_v('financialData', 'currentRatio'),
+    }
+    return info
+
+def _parse_financials(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Map quoteSummary statement-history modules to normalized yearly financials"""
+    def parse_statement(module_name):
+        stmt_data = {}
+        history = result.get(module_name, {}).get(module_name.replace('History', 'Statements'), [])
+        for item in history:
+            date = item.get('endDate', {}).get('fmt', '')[:4]
+            if not date: continue
+            
+            # To Crores
+            stmt_data[date] = {k: v['raw'] / 10000000 for k, v in item.items()
+                               if isinstance(v, dict) and 'raw' in v}
+        return stmt_data
+
+    income_stmt = parse_statement('incomeStatementHistory')
+    balance_sheet = parse_statement('balanceSheetHistory')
+    cash_flow = parse_statement('cashflowStatementHistory')
+    
+    # Normalize keys for the engine
+    normalized_income = {}
+    for yr, vals in income_stmt.items():
+        normalized_income[yr] = {
+            "revenue": vals.get('totalRevenue', 0),
+            "gross_profit": vals.get('grossProfit', 0),
+            "ebitda": vals.get('ebitda', 0),
+            "operating_income": vals.get('operatingIncome', 0),
+            "net_income": vals.get('netIncome', 0),
+            "interest_expense": vals.get('interestExpense', 0),
+            "tax_expense": vals.get('incomeTaxExpense', 0),
+        }
+
+    normalized_balance = {}
+    for yr, vals in balance_sheet.items():
+        normalized_balance[yr] = {
+            "total_assets": vals.get('totalAssets', 0),
+            "total_liabilities": vals.get('totalLiab', 0),
+            "total_equity": vals.get('totalStockholderEquity', 0),
+            "cash": vals.get('cash', 0),
+            "total_debt": vals.get('longTermDebt', 0) + vals.get('shortLongTermDebt', 0),
+            "current_assets": vals.get('totalCurrentAssets', 0),
+            "current_liabilities": vals.get('totalCurrentLiabilities', 0),
+        }
+
+    normalized_cash = {}
+    for yr, vals in cash_flow.items():
+        normalized_cash[yr] = {
+            "operating_cash_flow": vals.get('totalCashFromOperatingActivities', 0),
+            "capex": abs(vals.get('capitalExpenditures', 0)),
+            "depreciation": vals.get('depreciation', 0),
+            "free_cash_flow": vals.get('totalCashFromOperatingActivities', 0) + vals.get('capitalExpenditures', 0),
+        }
+
+    return {
+        "income_statement": normalized_income,
+        "balance_sheet": normalized_balance,
+        "cash_flow": normalized_cash,
+        "years_available": len(normalized_income),
+    }
+
+def _price_history_url(symbol: str, period: str) -> str:
+    """Chart API URL for a formatted symbol and period"""
+    # Map period to YF range
+    range_map = {"1y": "1y", "2y": "2y", "5y": "5y", "10y": "10y", "max": "max"}
+    r = range_map.get(period, "5y")
+    return f"{CHART_URL}{symbol}?range={r}&interval=1d"
+
+def _parse_price_history(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Compute return/volatility statistics from a Chart API payload"""
+    chart = data.get('chart', {}).get('result', [{}])[0]
+    if not chart: return None
+    
+    raw_closes = chart.get('indicators', {}).get('quote', [{}])[0].get('close', [])
+    
+    if NUMPY_AVAILABLE:
+        # Single pass: None -> NaN on the way in, then one mask to drop gaps
+        arr = np.fromiter((np.nan if c is None else c for c in raw_closes),
+                          dtype=np.float64, count=len(raw_closes))
+        arr = arr[~np.isnan(arr)]
+        if not arr.size: return None
+        
+        returns = np.diff(arr) / arr[:-1]
+        # Population std (ddof=0), matching the pure-Python path
+        avg_ret = float(returns.mean()) if returns.size else 0
+        std_ret = float(returns.std()) if returns.size else 0
+        first, last = float(arr[0]), float(arr[-1])
+        high, low = float(arr.max()), float(arr.min())
+    else:
+        closes = [c for c in raw_closes if c is not None]
         if not closes: return None
         
         returns = [(closes[i] / closes[i-1]) - 1 for i in range(1, len(closes))]
         avg_ret = sum(returns) / len(returns) if returns else 0
-        std_ret = (sum([(x - avg_ret)**2 for x in returns]) / len(returns))**0.5 if returns else 0
-        
-        return {
-            "current_price": closes[-1],
-            "start_price": closes[0],
-            "high": max(closes),
-            "low": min(closes),
-            "total_return": (closes[-1] / closes[0]) - 1,
-            "annualized_return": avg_ret * 252,
-            "volatility": std_ret * (252 ** 0.5),
-            "sharpe_ratio": (avg_ret * 252 - 0.07) / (std_ret * (252 ** 0.5)) if std_ret > 0 else 0,
-        }
-    except Exception as e:
-        logger.error(f"Error in get_price_history for {symbol}: {e}")
-        return None
+        std_ret = (sum((x - avg_ret)**2 for x in returns) / len(returns))**0.5 if returns else 0
+        first, last = closes[0], closes[-1]
+        high, low = max(closes), min(closes)
+    
+    return {
+        "current_price": last,
+        "start_price": first,
+        "high": high,
+        "low": low,
+        "total_return": (last / first) - 1,
+        "annualized_return": avg_ret * 252,
+        "volatility": std_ret * (252 ** 0.5),
+        "sharpe_ratio": (avg_ret * 252 - 0.07) / (std_ret * (252 ** 0.5)) if std_ret > 0 else 0,
+    }
+
+def _get_quotes_bulk(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch v7 quotes for formatted symbols, QUOTE_BATCH_SIZE per request
+    
+    Returns a dict keyed by the (formatted) symbol. Symbols missing from the
+    response are simply absent.
+    """
+    quotes = {}
+    for i in range(0, len(symbols), QUOTE_BATCH_SIZE):
+        chunk = symbols[i:i + QUOTE_BATCH_SIZE]
+        url = f"{QUOTE_URL}?symbols={','.join(chunk)}"
+        response = _make_yahoo_request(url, timeout=15)
+        if not response or response.status_code != 200:
+            logger.warning(f"Yahoo Quote API returned status {response.status_code if response else 'None'} for {len(chunk)} symbols")
+            continue
+        try:
+            for quote in _parse_json(response).get('quoteResponse', {}).get('result', []):
+                if quote.get('symbol'):
+                    quotes[quote['symbol']] = quote
+        except Exception as e:
+            logger.error(f"Error parsing bulk quotes: {e}")
+    return quotes
+
+def _peer_row_from_quote(quote: Dict[str, Any], is_main: bool) -> Optional[Dict[str, Any]]:
+    """Map a v7 quote to a peer comparison row, or None if key fields are missing"""
+    roe = quote.get('returnOnEquity')
+    if roe is None:
+        # v7 quotes usually lack ROE; derive it as trailing EPS / book value per share
+        eps, bvps = quote.get('epsTrailingTwelveMonths'), quote.get('bookValue')
+        if eps is None or not bvps:
+            return None
+        roe = eps / bvps
+    
+    return {
+        "symbol": quote['symbol'].replace('.NS', '').replace('.BO', ''),
+        "name": quote.get('longName') or quote.get('shortName') or quote['symbol'],
+        "market_cap": quote.get('marketCap', 0) / 10000000,
+        "pe_ratio": quote.get('trailingPE', 0),
+        "pb_ratio": quote.get('priceToBook', 0),
+        "roe": roe * 100,
+        "is_main": is_main,
+    }
 
 def get_peer_comparison(symbol: str, peers: Optional[List[str]] = None) -> Optional[List[Dict[str, Any]]]:
-    """Fetch peer data using multiple API calls"""
+    """Fetch peer data via batched v7 quote requests
+    
+    Symbols the bulk endpoint can't fully describe fall back to
+    get_stock_info (fetched concurrently).
+    """
     if not peers:
         peers = []
     
-    results = []
-    # Add main company
-    main_info = get_stock_info(symbol)
-    if main_info:
-        results.append({
-            "symbol": main_info["symbol"],
-            "name": main_info["name"],
-            "market_cap": main_info["market_cap"],
-            "pe_ratio": main_info["pe_ratio"],
-            "pb_ratio": main_info["pb_ratio"],
-            "roe": main_info["return_on_equity"] * 100,
-            "is_main": True,
-        })
-    
-    for p in peers:
-        p_info = get_stock_info(p)
-        if p_info:
-            results.append({
-                "symbol": p_info["symbol"],
-                "name": p_info["name"],
-                "market_cap": p_info["market_cap"],
-                "pe_ratio": p_info["pe_ratio"],
-                "pb_ratio": p_info["pb_ratio"],
-                "roe": p_info["return_on_equity"] * 100,
-                "is_main": False,
-            })
-    return results
+    symbols = [symbol] + list(peers)
+    formatted = [_format_symbol(s) for s in symbols]
+    quotes = _get_quotes_bulk(formatted)
+    
+    rows: List[Optional[Dict[str, Any]]] = []
+    misses = []
+    for i, fs in enumerate(formatted):
+        row = _peer_row_from_quote(quotes[fs], i == 0) if fs in quotes else None
+        if row is None:
+            misses.append(i)
+        rows.append(row)
+    
+    if misses:
+        # Fetch misses concurrently (network bound)
+        with ThreadPoolExecutor(max_workers=min(16, len(misses))) as executor:
+            infos = list(executor.map(get_stock_info, [symbols[i] for i in misses]))
+        for i, p_info in zip(misses, infos):
+            if p_info:
+                rows[i] = {
+                    "symbol": p_info["symbol"],
+                    "name": p_info["name"],
+                    "market_cap": p_info["market_cap"],
+                    "pe_ratio": p_info["pe_ratio"],
+                    "pb_ratio": p_info["pb_ratio"],
+                    "roe": p_info["return_on_equity"] * 100,
+                    "is_main": i == 0,
+                }
+    
+    return [row for row in rows if row]
 
-def search_stocks(query: str, limit: int = 10) -> List[Dict[str, str]]:
-    """Simple offline search for common Indian stocks"""
-    common_stocks = [
-        {"symbol": "RELIANCE", "name": "Reliance Industries Ltd"},
-        {"symbol": "TCS", "name": "Tata Consultancy Services"},
-        {"symbol": "HDFCBANK", "name": "HDFC Bank Ltd"},
-        {"symbol": "INFY", "name": "Infosys Ltd"},
-        {"symbol": "ICICIBANK", "name": "ICICI Bank Ltd"},
-        {"symbol": "HINDUNILVR", "name": "Hindustan Unilever Ltd"},
-        {"symbol": "SBIN", "name": "State Bank of India"},
-        {"symbol": "BHARTIARTL", "name": "Bharti Airtel Ltd"},
-        {"symbol": "ITC", "name": "ITC Ltd"},
-        {"symbol": "WIPRO", "name": "Wipro Ltd"},
-        {"symbol": "ADANIPOWER", "name": "Adani Power"},
-    ]
-    query_lower = query.lower()
-    return [s for s in common_stocks if query_lower in s["symbol"].lower() or query_lower in s["name"].lower()][:limit]
+# (symbol, name, symbol.lower(), name.lower()) for the offline search_stocks fallback
+_COMMON_STOCKS = tuple(
+    (symbol, name, symbol.lower(), name.lower())
+    for symbol, name in (
+        ("RELIANCE", "Reliance Industries Ltd"),
+        ("TCS", "Tata Consultancy Services"),
+        ("HDFCBANK", "HDFC Bank Ltd"),
+        ("INFY", "Infosys Ltd"),
+        ("ICICIBANK", "ICICI Bank Ltd"),
+        ("HINDUNILVR", "Hindustan Unilever Ltd"),
+        ("SBIN", "State Bank of India"),
+        ("BHARTIARTL", "Bharti Airtel Ltd"),
+        ("ITC", "ITC Ltd"),
+        ("KOTAKBANK", "Kotak Mahindra Bank"),
+        ("LT", "Larsen & Toubro Ltd"),
+        ("AXISBANK", "Axis Bank Ltd"),
+        ("WIPRO", "Wipro Ltd"),
+        ("ASIANPAINT", "Asian Paints Ltd"),
+        ("MARUTI", "Maruti Suzuki India Ltd"),
+        ("TITAN", "Titan Company Ltd"),
+        ("SUNPHARMA", "Sun Pharmaceutical"),
+        ("ULTRACEMCO", "UltraTech Cement Ltd"),
+        ("TATAMOTORS", "Tata Motors Ltd"),
+        ("POWERGRID", "Power Grid Corporation"),
+    )
+)
 
 
-def _get_value(df, col, possible_keys: List[str]) -> float:
+def _get_value(df, col, possible_keys: Tuple[str, ...]) -> float:
     """Helper to get value from dataframe with multiple possible keys"""
     for key in possible_keys:
-        if key in df.index:
-            val = df.loc[key, col]
-            if val is not None and not (hasattr(val, '__iter__') and not isinstance(val, str)):
-                return float(val) / 10000000  # Convert to Crores
+        if key not in df.index:
+            continue
+        val = df.loc[key, col]
+        if val is None:
+            continue
+        # Scalar floats (incl. numpy.float64) are the common case
+        if isinstance(val, float):
+            if math.isnan(val):
+                continue  # Missing, try the next key
+            return val / 10000000  # Convert to Crores
+        if isinstance(val, int):
+            return val / 10000000
+        # Unusual array-like / numpy int fallback
+        try:
+            val = float(val)
+        except (TypeError, ValueError):
+            continue
+        if math.isnan(val):
+            continue
+        return val / 10000000
     return 0.0
 
 
@@ -512,35 +1221,13 @@ def search_stocks(query: str, limit: int = 10) -> List[Dict[str, str]]:
     Returns:
         List of matching stocks
     """
-    # For Yahoo Finance, we'd need a separate search API
-    # This is a placeholder that returns common Indian stocks
-    common_stocks = [
-        {"symbol": "RELIANCE", "name": "Reliance Industries Ltd"},
-        {"symbol": "TCS", "name": "Tata Consultancy Services"},
-        {"symbol": "HDFCBANK", "name": "HDFC Bank Ltd"},
-        {"symbol": "INFY", "name": "Infosys Ltd"},
-        {"symbol": "ICICIBANK", "name": "ICICI Bank Ltd"},
-        {"symbol": "HINDUNILVR", "name": "Hindustan Unilever Ltd"},
-        {"symbol": "SBIN", "name": "State Bank of India"},
-        {"symbol": "BHARTIARTL", "name": "Bharti Airtel Ltd"},
-        {"symbol": "ITC", "name": "ITC Ltd"},
-        {"symbol": "KOTAKBANK", "name": "Kotak Mahindra Bank"},
-        {"symbol": "LT", "name": "Larsen & Toubro Ltd"},
-        {"symbol": "AXISBANK", "name": "Axis Bank Ltd"},
-        {"symbol": "WIPRO", "name": "Wipro Ltd"},
-        {"symbol": "ASIANPAINT", "name": "Asian Paints Ltd"},
-        {"symbol": "MARUTI", "name": "Maruti Suzuki India Ltd"},
-        {"symbol": "TITAN", "name": "Titan Company Ltd"},
-        {"symbol": "SUNPHARMA", "name": "Sun Pharmaceutical"},
-        {"symbol": "ULTRACEMCO", "name": "UltraTech Cement Ltd"},
-        {"symbol": "TATAMOTORS", "name": "Tata Motors Ltd"},
-        {"symbol": "POWERGRID", "name": "Power Grid Corporation"},
-    ]
-    
+    # For Yahoo Finance, we'd need a separate search API.
+    # This is a placeholder that searches common Indian stocks.
     query_lower = query.lower()
     results = [
-        stock for stock in common_stocks
-        if query_lower in stock["symbol"].lower() or query_lower in stock["name"].lower()
+        {"symbol": symbol, "name": name}
+        for symbol, name, symbol_lower, name_lower in _COMMON_STOCKS
+        if query_lower in symbol_lower or query_lower in name_lower
     ]
     
     return results[:limit]
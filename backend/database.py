@@ -4,80 +4,296 @@ Handles job persistence using SQLite
 """
 
 import os
+import logging
 import sqlite3
+import threading
+import time
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple, Union
 import json
+import zlib
 from contextlib import contextmanager
+from functools import lru_cache
+
+# Prefer orjson for the request/result/configuration JSON columns
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize to a JSON string (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+
+def _loads(data: Any) -> Any:
+    """Parse a JSON string (orjson when available); raises json.JSONDecodeError"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+logger = logging.getLogger(__name__)
+
 
 # Database path
 import tempfile
 
 # Database path
-# Use /tmp on Vercel (read-only filesystem elsewhere)
+# Use a writable scratch dir on Vercel (read-only filesystem elsewhere);
+# prefer the /dev/shm tmpfs so commits are memory copies rather than disk I/O
+SHM_DIR = "/dev/shm"
+
 if os.environ.get("VERCEL"):
-    DB_PATH = os.path.join(tempfile.gettempdir(), "models.db")
+    if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+        DB_PATH = os.path.join(SHM_DIR, "models.db")
+    else:
+        DB_PATH = os.path.join(tempfile.gettempdir(), "models.db")
 else:
     DB_PATH = os.path.join(os.path.dirname(__file__), "models.db")
 
 
+# WAL lets readers proceed during job/metrics commits; on Vercel the /tmp
+# database is ephemeral per instance, so skip the extra -wal/-shm files there
+USE_WAL = not os.environ.get("VERCEL")
+
+
+def _apply_pragmas(conn: sqlite3.Connection):
+    """Per-connection tuning (synchronous/cache settings are not persisted)"""
+    if USE_WAL:
+        # NORMAL is safe under WAL and avoids an fsync on every commit
+        conn.execute("PRAGMA synchronous=NORMAL")
+    else:
+        # Stateless Vercel worker: the file need not survive a crash, so
+        # skip fsyncs and keep the rollback journal in memory
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA journal_mode=MEMORY")
+    # Required for ON DELETE CASCADE on model_metrics
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")  # ~20 MB
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+
+
+# One long-lived connection per thread, reused across calls
+_local = threading.local()
+
+# Bump when init_db's DDL/migrations change; files already at this
+# PRAGMA user_version skip the schema work entirely
+SCHEMA_VERSION = 2
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
 def get_connection():
-    """Get database connection"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """Get this thread's database connection (opened on first use)"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        # Room for every distinct UPDATE column set so re-prepares are rare
+        # Autocommit at the driver level; get_db() issues BEGIN/COMMIT itself
+        conn = sqlite3.connect(DB_PATH, cached_statements=256, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        _apply_pragmas(conn)
+        _ensure_schema(conn)
+        _local.conn = conn
+        # Dimension name <-> id maps belong to this connection's database file
+        _local.dimension_ids = {}
+        _local.dimension_names = {}
     return conn
 
 
+def _ensure_schema(conn: sqlite3.Connection):
+    """Run init_db once per process, on the first connection opened"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if not _schema_ready:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                _create_schema(conn)
+            _schema_ready = True
+
+
 @contextmanager
 def get_db():
-    """Context manager for database connections"""
+    """Context manager for a write transaction on the thread's pooled connection"""
     conn = get_connection()
+    # Take the write lock up front rather than upgrading SHARED -> RESERVED on
+    # the first write, which can fail with SQLITE_BUSY under concurrency
+    conn.execute("BEGIN IMMEDIATE")
     try:
         yield conn
-        conn.commit()
+        conn.execute("COMMIT")
     except Exception:
-        conn.rollback()
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
         raise
-    finally:
-        conn.close()
+
+
+@contextmanager
+def get_db_readonly():
+    """Context manager for reads; no transaction, so WAL readers never block writers"""
+    yield get_connection()
+
+
+_JOBS_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id TEXT PRIMARY KEY,
+        company_id INTEGER NOT NULL REFERENCES companies(id),
+        symbol TEXT,
+        industry_id INTEGER REFERENCES industries(id),
+        model_type TEXT DEFAULT 'general',
+        status TEXT DEFAULT 'pending',
+        progress INTEGER DEFAULT 0,
+        message TEXT,
+        file_path TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        forecast_years INTEGER DEFAULT 5,
+        source TEXT DEFAULT 'stock'
+    )
+"""
+
+_MODEL_METRICS_DDL = """
+    CREATE TABLE IF NOT EXISTS model_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL,
+        metric_name TEXT NOT NULL,
+        metric_value REAL,
+        metric_format TEXT DEFAULT 'number',
+        FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
+    )
+"""
 
 
 def init_db():
-    """Initialize database tables"""
-    with get_db() as conn:
+    """Initialize database tables (no-op once the schema is current)"""
+    get_connection()
+
+
+def _create_schema(conn: sqlite3.Connection):
+    """Create/migrate all tables in a single transaction"""
+    # Journal mode is persistent per database file and cannot change
+    # inside a transaction, so set it first
+    if USE_WAL:
+        conn.execute("PRAGMA journal_mode=WAL")
+    # Table rebuilds below DROP jobs; with enforcement on that would cascade
+    # into job_payloads/model_metrics. Can only be toggled outside a transaction.
+    conn.execute("PRAGMA foreign_keys=OFF")
+    
+    conn.execute("BEGIN IMMEDIATE")
+    try:
         cursor = conn.cursor()
         
+        # Company/industry names are stored once and referenced by id
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS companies (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS industries (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        """)
+        
         # Jobs table
+        cursor.execute(_JOBS_DDL.format(table="jobs"))
+        
+        # Request/result JSON lives in a 1:1 side table so status/progress
+        # updates only rewrite the small jobs row
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS jobs (
-                id TEXT PRIMARY KEY,
-                company_name TEXT NOT NULL,
-                symbol TEXT,
-                industry TEXT,
-                model_type TEXT DEFAULT 'general',
-                status TEXT DEFAULT 'pending',
-                progress INTEGER DEFAULT 0,
-                message TEXT,
-                file_path TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                forecast_years INTEGER DEFAULT 5,
-                source TEXT DEFAULT 'stock',
-                request_data TEXT,
-                result_data TEXT
+            CREATE TABLE IF NOT EXISTS job_payloads (
+                job_id TEXT PRIMARY KEY,
+                request_data BLOB,
+                result_data BLOB,
+                FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
             )
         """)
         
+        # Older databases kept the payloads inline on jobs; move them over
+        job_columns = {col['name'] for col in cursor.execute("PRAGMA table_info(jobs)")}
+        if 'request_data' in job_columns:
+            cursor.execute("""
+                INSERT OR IGNORE INTO job_payloads (job_id, request_data, result_data)
+                SELECT id, request_data, result_data FROM jobs
+                WHERE request_data IS NOT NULL OR result_data IS NOT NULL
+            """)
+            if sqlite3.sqlite_version_info >= (3, 35, 0):
+                cursor.execute("ALTER TABLE jobs DROP COLUMN request_data")
+                cursor.execute("ALTER TABLE jobs DROP COLUMN result_data")
+            else:
+                cursor.execute("UPDATE jobs SET request_data = NULL, result_data = NULL")
+        
+        # Older databases stored company_name/industry text on every job;
+        # rebuild jobs against the dimension tables
+        if 'company_name' in job_columns:
+            cursor.execute(_JOBS_DDL.format(table="jobs_new"))
+            cursor.execute("""
+                INSERT OR IGNORE INTO companies (name)
+                SELECT DISTINCT company_name FROM jobs
+            """)
+            cursor.execute("""
+                INSERT OR IGNORE INTO industries (name)
+                SELECT DISTINCT industry FROM jobs WHERE industry IS NOT NULL
+            """)
+            cursor.execute("""
+                INSERT INTO jobs_new (
+                    id, company_id, symbol, industry_id, model_type, status, progress,
+                    message, file_path, created_at, completed_at, forecast_years, source
+                )
+                SELECT j.id, c.id, j.symbol, i.id, j.model_type, j.status, j.progress,
+                       j.message, j.file_path, j.created_at, j.completed_at,
+                       j.forecast_years, j.source
+                FROM jobs j
+                JOIN companies c ON c.name = j.company_name
+                LEFT JOIN industries i ON i.name = j.industry
+            """)
+            cursor.execute("DROP TABLE jobs")
+            cursor.execute("ALTER TABLE jobs_new RENAME TO jobs")
+        
         # Model metrics table (for preview)
+        cursor.execute(_MODEL_METRICS_DDL)
+        
+        # Older databases declared the metrics FK without ON DELETE CASCADE;
+        # rebuild the table once so deleting a job also removes its metrics
+        fks = cursor.execute("PRAGMA foreign_key_list(model_metrics)").fetchall()
+        if any(fk['on_delete'].upper() != 'CASCADE' for fk in fks):
+            cursor.execute("DROP INDEX IF EXISTS idx_metrics_job")
+            cursor.execute("ALTER TABLE model_metrics RENAME TO model_metrics_old")
+            cursor.execute(_MODEL_METRICS_DDL)
+            # Rows for already-deleted jobs are carried over as-is (FK checks
+            # are off here); report them rather than dropping data silently
+            orphans = cursor.execute("""
+                SELECT COUNT(*) FROM model_metrics_old
+                WHERE job_id NOT IN (SELECT id FROM jobs)
+            """).fetchone()[0]
+            if orphans:
+                logger.warning(
+                    "model_metrics migration kept %d rows whose job no longer exists", orphans
+                )
+            cursor.execute("""
+                INSERT INTO model_metrics (id, job_id, metric_name, metric_value, metric_format)
+                SELECT id, job_id, metric_name, metric_value, metric_format FROM model_metrics_old
+            """)
+            cursor.execute("DROP TABLE model_metrics_old")
+        
+        # Indexes for the history / re-download listings and metric lookups
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS model_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_id TEXT NOT NULL,
-                metric_name TEXT NOT NULL,
-                metric_value REAL,
-                metric_format TEXT DEFAULT 'number',
-                FOREIGN KEY (job_id) REFERENCES jobs(id)
-            )
+            CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at DESC)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_completed ON jobs(completed_at DESC)
+            WHERE status = 'completed' AND file_path IS NOT NULL
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_metrics_job ON model_metrics(job_id)
         """)
         
         # User preferences table
@@ -88,11 +304,210 @@ def init_db():
             )
         """)
         
-        conn.commit()
+        # Saved projects table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS saved_projects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                description TEXT,
+                project_type TEXT DEFAULT 'general',
+                configuration TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys=ON")
 
 
 # Job CRUD operations
 
+# Job row as callers see it: company/industry names joined back in from the
+# dimension tables. Listing queries select only these, while get_job (and
+# history with include_payloads) also joins in the request_data/result_data
+# payloads
+_JOB_COLUMNS = (
+    "j.id, c.name AS company_name, j.symbol, i.name AS industry, j.model_type, "
+    "j.status, j.progress, j.message, j.file_path, j.created_at, j.completed_at, "
+    "j.forecast_years, j.source"
+)
+_JOB_FROM = (
+    "jobs j JOIN companies c ON c.id = j.company_id "
+    "LEFT JOIN industries i ON i.id = j.industry_id"
+)
+# RETURNING can't join, so writes return the raw ids and names are mapped
+# back in Python (see _job_from_returning)
+_JOB_RETURNING_COLUMNS = (
+    "id, company_id, symbol, industry_id, model_type, status, progress, message, "
+    "file_path, created_at, completed_at, forecast_years, source"
+)
+
+# Dimension columns: caller-facing name column -> (id column, table)
+_DIMENSIONS = {
+    'company_name': ('company_id', 'companies'),
+    'industry': ('industry_id', 'industries'),
+}
+
+# JSON payload columns (stored in job_payloads); values at least this long
+# are stored zlib-compressed as BLOBs
+_PAYLOAD_COLUMNS = ('request_data', 'result_data')
+PAYLOAD_COMPRESS_THRESHOLD = 1024
+
+# SQL text lives in module constants so helpers never rebuild it per call and
+# every execution hits the connection's statement cache
+_SQL_INSERT_JOB = """
+    INSERT INTO jobs (id, company_id, symbol, industry_id, forecast_years, source)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_DIMENSION = {
+    table: f"INSERT INTO {table} (name) VALUES (?) ON CONFLICT(name) DO NOTHING"
+    for _, table in _DIMENSIONS.values()
+}
+_SQL_DIMENSION_ID = {
+    table: f"SELECT id FROM {table} WHERE name = ?" for _, table in _DIMENSIONS.values()
+}
+_SQL_DIMENSION_NAME = {
+    table: f"SELECT name FROM {table} WHERE id = ?" for _, table in _DIMENSIONS.values()
+}
+_SQL_INSERT_REQUEST_PAYLOAD = "INSERT INTO job_payloads (job_id, request_data) VALUES (?, ?)"
+_SQL_UPSERT_PAYLOAD = {
+    key: f"""
+        INSERT INTO job_payloads (job_id, {key})
+        SELECT id, ? FROM jobs WHERE id = ?
+        ON CONFLICT(job_id) DO UPDATE SET {key} = excluded.{key}
+    """
+    for key in _PAYLOAD_COLUMNS
+}
+_SQL_GET_JOB = f"""
+    SELECT {_JOB_COLUMNS}, p.request_data, p.result_data
+    FROM {_JOB_FROM} LEFT JOIN job_payloads p ON p.job_id = j.id
+    WHERE j.id = ?
+"""
+_SQL_GET_PAYLOADS = "SELECT request_data, result_data FROM job_payloads WHERE job_id = ?"
+_SQL_JOB_HISTORY = f"""
+    SELECT {_JOB_COLUMNS} FROM {_JOB_FROM} 
+    ORDER BY j.created_at DESC 
+    LIMIT ? OFFSET ?
+"""
+_SQL_JOB_HISTORY_WITH_PAYLOADS = f"""
+    SELECT {_JOB_COLUMNS}, p.request_data, p.result_data
+    FROM {_JOB_FROM} LEFT JOIN job_payloads p ON p.job_id = j.id
+    ORDER BY j.created_at DESC 
+    LIMIT ? OFFSET ?
+"""
+_SQL_COMPLETED_JOBS = f"""
+    SELECT {_JOB_COLUMNS} FROM {_JOB_FROM} 
+    WHERE j.status = 'completed' AND j.file_path IS NOT NULL
+    ORDER BY j.completed_at DESC 
+    LIMIT ?
+"""
+_SQL_DELETE_JOB = "DELETE FROM jobs WHERE id = ?"
+
+_UPDATE_JOB_SINGLE = {
+    'status': "UPDATE jobs SET status = ? WHERE id = ?",
+    'progress': "UPDATE jobs SET progress = ? WHERE id = ?",
+    'message': "UPDATE jobs SET message = ? WHERE id = ?",
+}
+
+
+def _pack_payload(data: Union[Dict, str]) -> Union[str, bytes]:
+    """JSON-encode a payload column value, compressing large ones"""
+    text = data if isinstance(data, str) else _dumps(data)
+    if len(text) < PAYLOAD_COMPRESS_THRESHOLD:
+        return text
+    return zlib.compress(text.encode(), 6)
+
+
+def _unpack_payloads(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Decompress BLOB payload columns back to JSON text in place"""
+    for key in _PAYLOAD_COLUMNS:
+        value = job.get(key)
+        if isinstance(value, bytes):
+            job[key] = zlib.decompress(value).decode()
+    return job
+
+
+# INSERT/UPDATE ... RETURNING needs SQLite 3.35+
+RETURNING_SUPPORTED = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+@lru_cache(maxsize=256)
+def _returning_sql(sql: str) -> str:
+    """Append the RETURNING clause for a jobs write (built once per statement)"""
+    return f"{sql} RETURNING {_JOB_RETURNING_COLUMNS}"
+
+
+# name <-> id maps for the dimension tables, kept per connection (see
+# get_connection) so they never outlive the database file they were read
+# from. Rows are never deleted, so entries stay valid once the row that
+# produced them has been committed.
+def _dimension_caches() -> Tuple[Dict[Tuple[str, str], int], Dict[Tuple[str, int], str]]:
+    """This thread's (name -> id, id -> name) dimension maps"""
+    get_connection()
+    return _local.dimension_ids, _local.dimension_names
+
+
+def _dimension_id(table: str, name: Optional[str]) -> Optional[int]:
+    """Id of a company/industry name, inserting it in its own transaction if new"""
+    if name is None:
+        return None
+    ids, names = _dimension_caches()
+    dim_id = ids.get((table, name))
+    if dim_id is None:
+        # Committed before the caller's job write so a rollback there can
+        # never leave a cached id pointing at a missing row
+        with get_db() as conn:
+            conn.execute(_SQL_INSERT_DIMENSION[table], (name,))
+            dim_id = conn.execute(_SQL_DIMENSION_ID[table], (name,)).fetchone()[0]
+        ids[(table, name)] = dim_id
+        names[(table, dim_id)] = name
+    return dim_id
+
+
+def _dimension_name(conn: sqlite3.Connection, table: str, dim_id: Optional[int]) -> Optional[str]:
+    """Name for a company/industry id"""
+    if dim_id is None:
+        return None
+    ids, names = _dimension_caches()
+    name = names.get((table, dim_id))
+    if name is None:
+        name = conn.execute(_SQL_DIMENSION_NAME[table], (dim_id,)).fetchone()[0]
+        names[(table, dim_id)] = name
+        ids[(table, name)] = dim_id
+    return name
+
+
+def _job_from_returning(conn: sqlite3.Connection, row: sqlite3.Row) -> Dict[str, Any]:
+    """Turn a RETURNING row into the get_job shape (ids -> names)"""
+    job = dict(row)
+    for name_column, (id_column, table) in _DIMENSIONS.items():
+        job[name_column] = _dimension_name(conn, table, job.pop(id_column))
+    return job
+
+
+def _execute_returning(conn: sqlite3.Connection, sql: str, params) -> Optional[sqlite3.Row]:
+    """Run a jobs INSERT/UPDATE, returning the written row when RETURNING is
+    available (None on older SQLite or when no row matched)"""
+    if not RETURNING_SUPPORTED:
+        conn.execute(sql, params)
+        return None
+    rows = conn.execute(_returning_sql(sql), params).fetchall()
+    return rows[0] if rows else None
+
+
+def _get_payloads(conn: sqlite3.Connection, job_id: str) -> Dict[str, Any]:
+    """Fetch a job's request_data/result_data row"""
+    row = conn.execute(_SQL_GET_PAYLOADS, (job_id,)).fetchone()
+    return dict(row) if row else dict.fromkeys(_PAYLOAD_COLUMNS)
+
+
 def create_job(
     job_id: str,
     company_name: str,
@@ -103,32 +518,34 @@ def create_job(
     request_data: Optional[Dict] = None
 ) -> Dict[str, Any]:
     """Create a new job"""
+    payload = _pack_payload(request_data) if request_data else None
+    company_id = _dimension_id('companies', company_name)
+    industry_id = _dimension_id('industries', industry)
     with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO jobs (id, company_name, symbol, industry, forecast_years, source, request_data)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+        row = _execute_returning(conn, _SQL_INSERT_JOB, (
             job_id, 
-            company_name, 
+            company_id, 
             symbol, 
-            industry, 
+            industry_id, 
             forecast_years, 
-            source,
-            json.dumps(request_data) if request_data else None
+            source
         ))
-    return get_job(job_id)
+        if payload is not None:
+            conn.execute(_SQL_INSERT_REQUEST_PAYLOAD, (job_id, payload))
+        if row is not None:
+            job = _job_from_returning(conn, row)
+    
+    if row is None:
+        return get_job(job_id)
+    job.update(request_data=payload, result_data=None)
+    return _unpack_payloads(job)
 
 
 def get_job(job_id: str) -> Optional[Dict[str, Any]]:
     """Get job by ID"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
-        row = cursor.fetchone()
-        if row:
-            return dict(row)
-    return None
+    with get_db_readonly() as conn:
+        row = conn.execute(_SQL_GET_JOB, (job_id,)).fetchone()
+    return _unpack_payloads(dict(row)) if row else None
 
 
 def update_job(job_id: str, **kwargs) -> Optional[Dict[str, Any]]:
@@ -137,131 +554,211 @@ def update_job(job_id: str, **kwargs) -> Optional[Dict[str, Any]]:
         return get_job(job_id)
     
     # Handle special fields
-    if 'request_data' in kwargs and isinstance(kwargs['request_data'], dict):
-        kwargs['request_data'] = json.dumps(kwargs['request_data'])
-    if 'result_data' in kwargs and isinstance(kwargs['result_data'], dict):
-        kwargs['result_data'] = json.dumps(kwargs['result_data'])
+    payloads = {}
+    for key in _PAYLOAD_COLUMNS:
+        if key in kwargs:
+            value = kwargs.pop(key)
+            payloads[key] = _pack_payload(value) if isinstance(value, (dict, str)) else value
+    for name_column, (id_column, table) in _DIMENSIONS.items():
+        if name_column in kwargs:
+            kwargs[id_column] = _dimension_id(table, kwargs.pop(name_column))
     
-    set_clause = ", ".join(f"{k} = ?" for k in kwargs.keys())
-    values = list(kwargs.values()) + [job_id]
+    sql = None
+    if len(kwargs) == 1 and next(iter(kwargs)) in _UPDATE_JOB_SINGLE:
+        # Progress polling updates a single field; use a constant statement
+        (column, value), = kwargs.items()
+        sql = _UPDATE_JOB_SINGLE[column]
+        values = [value, job_id]
+    elif kwargs:
+        # Fixed column order -> identical SQL text for the same column set,
+        # so the connection's statement cache can reuse the prepared statement
+        columns = sorted(kwargs)
+        set_clause = ", ".join(f"{k} = ?" for k in columns)
+        sql = f"UPDATE jobs SET {set_clause} WHERE id = ?"
+        values = [kwargs[k] for k in columns] + [job_id]
     
+    row = None
     with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute(f"UPDATE jobs SET {set_clause} WHERE id = ?", values)
+        if sql:
+            row = _execute_returning(conn, sql, values)
+        for key in sorted(payloads):
+            conn.execute(_SQL_UPSERT_PAYLOAD[key], (payloads[key], job_id))
+        if row is not None:
+            # Updated row came back via RETURNING; only the payloads remain
+            job = _job_from_returning(conn, row)
+            job.update(_get_payloads(conn, job_id))
     
-    return get_job(job_id)
+    if row is None:
+        return get_job(job_id)
+    return _unpack_payloads(job)
 
 
-def get_job_history(limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+def iter_job_history(
+    limit: int = 50, offset: int = 0, include_payloads: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Yield job history rows ordered by creation date, one at a time.
+    
+    Listing rows omit request_data/result_data unless include_payloads is set.
+    """
+    if not include_payloads:
+        # Plain SELECT on the thread's connection: no transaction is held open
+        # while the caller consumes the rows
+        for row in get_connection().execute(_SQL_JOB_HISTORY, (limit, offset)):
+            yield dict(row)
+        return
+    for row in get_connection().execute(_SQL_JOB_HISTORY_WITH_PAYLOADS, (limit, offset)):
+        yield _unpack_payloads(dict(row))
+
+
+def get_job_history(
+    limit: int = 50, offset: int = 0, include_payloads: bool = False
+) -> List[Dict[str, Any]]:
     """Get job history ordered by creation date"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM jobs 
-            ORDER BY created_at DESC 
-            LIMIT ? OFFSET ?
-        """, (limit, offset))
-        return [dict(row) for row in cursor.fetchall()]
+    return list(iter_job_history(limit, offset, include_payloads))
 
 
 def get_completed_jobs(limit: int = 20) -> List[Dict[str, Any]]:
     """Get completed jobs for re-download"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM jobs 
-            WHERE status = 'completed' AND file_path IS NOT NULL
-            ORDER BY completed_at DESC 
-            LIMIT ?
-        """, (limit,))
-        return [dict(row) for row in cursor.fetchall()]
+    with get_db_readonly() as conn:
+        return [dict(row) for row in conn.execute(_SQL_COMPLETED_JOBS, (limit,))]
 
 
 def delete_job(job_id: str) -> bool:
     """Delete a job"""
     with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM model_metrics WHERE job_id = ?", (job_id,))
-        cursor.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
-        return cursor.rowcount > 0
+        # model_metrics rows go with it via ON DELETE CASCADE
+        return conn.execute(_SQL_DELETE_JOB, (job_id,)).rowcount > 0
 
 
 # Model metrics operations
 
+_SQL_DELETE_METRICS = "DELETE FROM model_metrics WHERE job_id = ?"
+_SQL_INSERT_METRIC = """
+    INSERT INTO model_metrics (job_id, metric_name, metric_value, metric_format)
+    VALUES (?, ?, ?, ?)
+"""
+_SQL_GET_METRICS = """
+    SELECT metric_name, metric_value, metric_format 
+    FROM model_metrics WHERE job_id = ?
+"""
+_SQL_GET_JOB_WITH_METRICS = f"""
+    SELECT {_JOB_COLUMNS},
+           p.request_data, p.result_data,
+           m.metric_name, m.metric_value, m.metric_format
+    FROM {_JOB_FROM}
+    LEFT JOIN job_payloads p ON p.job_id = j.id
+    LEFT JOIN model_metrics m ON m.job_id = j.id
+    WHERE j.id = ?
+    ORDER BY m.id
+"""
+_METRIC_COLUMNS = ('metric_name', 'metric_value', 'metric_format')
+
+
 def save_model_metrics(job_id: str, metrics: List[Dict[str, Any]]):
     """Save model metrics for preview"""
     with get_db() as conn:
-        cursor = conn.cursor()
         # Clear existing metrics
-        cursor.execute("DELETE FROM model_metrics WHERE job_id = ?", (job_id,))
-        # Insert new metrics
-        for metric in metrics:
-            cursor.execute("""
-                INSERT INTO model_metrics (job_id, metric_name, metric_value, metric_format)
-                VALUES (?, ?, ?, ?)
-            """, (
-                job_id,
-                metric.get('name'),
-                metric.get('value'),
-                metric.get('format', 'number')
-            ))
+        conn.execute(_SQL_DELETE_METRICS, (job_id,))
+        # Insert new metrics in one batch
+        conn.executemany(_SQL_INSERT_METRIC, [
+            (job_id, metric.get('name'), metric.get('value'), metric.get('format', 'number'))
+            for metric in metrics
+        ])
 
 
 def get_model_metrics(job_id: str) -> List[Dict[str, Any]]:
     """Get model metrics for preview"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT metric_name, metric_value, metric_format 
-            FROM model_metrics WHERE job_id = ?
-        """, (job_id,))
-        return [dict(row) for row in cursor.fetchall()]
+    with get_db_readonly() as conn:
+        return [dict(row) for row in conn.execute(_SQL_GET_METRICS, (job_id,))]
+
+
+def get_job_with_metrics(job_id: str) -> Optional[Dict[str, Any]]:
+    """Get a job plus its preview metrics (under 'metrics') in one query"""
+    with get_db_readonly() as conn:
+        rows = conn.execute(_SQL_GET_JOB_WITH_METRICS, (job_id,)).fetchall()
+    if not rows:
+        return None
+    
+    job = dict(rows[0])
+    for key in _METRIC_COLUMNS:
+        del job[key]
+    # LEFT JOIN yields a single all-NULL metric row when there are none
+    job['metrics'] = [
+        {key: row[key] for key in _METRIC_COLUMNS}
+        for row in rows if row['metric_name'] is not None
+    ]
+    return _unpack_payloads(job)
 
 
 # Preferences operations
 
+# Raw stored preference text (or _MISSING) keyed by preference key; values
+# are decoded on every read so callers never share a mutable cached object.
+# The TTL bounds staleness when another worker process writes the same key.
+PREFERENCE_CACHE_TTL = 300
+_MISSING = object()
+_pref_cache: Dict[str, Tuple[float, Any]] = {}
+
+_SQL_GET_PREFERENCE = "SELECT value FROM preferences WHERE key = ?"
+# Upsert updates the row in place; INSERT OR REPLACE deletes and re-inserts
+_SQL_SET_PREFERENCE = """
+    INSERT INTO preferences (key, value) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value
+"""
+
+
+def clear_preferences_cache():
+    """Drop all cached preference values"""
+    _pref_cache.clear()
+
+
 def get_preference(key: str, default: Any = None) -> Any:
     """Get a preference value"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT value FROM preferences WHERE key = ?", (key,))
-        row = cursor.fetchone()
+    entry = _pref_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        text = entry[1]
+    else:
+        text = _MISSING
+        with get_db_readonly() as conn:
+            row = conn.execute(_SQL_GET_PREFERENCE, (key,)).fetchone()
         if row:
-            try:
-                return json.loads(row['value'])
-            except json.JSONDecodeError:
-                return row['value']
-    return default
+            text = row['value']
+        _pref_cache[key] = (time.monotonic() + PREFERENCE_CACHE_TTL, text)
+    
+    if text is _MISSING:
+        return default
+    try:
+        return _loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return text
 
 
 def set_preference(key: str, value: Any):
     """Set a preference value"""
+    json_value = _dumps(value) if not isinstance(value, str) else value
     with get_db() as conn:
-        cursor = conn.cursor()
-        json_value = json.dumps(value) if not isinstance(value, str) else value
-        cursor.execute("""
-            INSERT OR REPLACE INTO preferences (key, value) VALUES (?, ?)
-        """, (key, json_value))
+        conn.execute(_SQL_SET_PREFERENCE, (key, json_value))
+    # Re-read on next get so the cached text matches what is stored
+    _pref_cache.pop(key, None)
 
 
 # Saved Projects operations
 
+_SQL_INSERT_PROJECT = """
+    INSERT INTO saved_projects (name, description, project_type, configuration)
+    VALUES (?, ?, ?, ?)
+"""
+_SQL_GET_PROJECT = "SELECT * FROM saved_projects WHERE id = ?"
+_SQL_ALL_PROJECTS = """
+    SELECT id, name, description, project_type, created_at, updated_at 
+    FROM saved_projects ORDER BY updated_at DESC
+"""
+_SQL_DELETE_PROJECT = "DELETE FROM saved_projects WHERE id = ?"
+
+
 def init_projects_table():
-    """Initialize saved projects table"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS saved_projects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT,
-                project_type TEXT DEFAULT 'general',
-                configuration TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.commit()
+    """Initialize saved projects table (now created by init_db)"""
+    init_db()
 
 
 def save_project(
@@ -271,41 +768,38 @@ def save_project(
     description: str = None
 ) -> Dict[str, Any]:
     """Save a project configuration"""
+    # Encode before taking the write lock
+    config_json = _dumps(configuration)
     with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO saved_projects (name, description, project_type, configuration)
-            VALUES (?, ?, ?, ?)
-        """, (name, description, project_type, json.dumps(configuration)))
-        project_id = cursor.lastrowid
+        project_id = conn.execute(
+            _SQL_INSERT_PROJECT, (name, description, project_type, config_json)
+        ).lastrowid
     return get_project(project_id)
 
 
 def get_project(project_id: int) -> Optional[Dict[str, Any]]:
     """Get a saved project by ID"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM saved_projects WHERE id = ?", (project_id,))
-        row = cursor.fetchone()
-        if row:
-            result = dict(row)
-            try:
-                result['configuration'] = json.loads(result['configuration'])
-            except (json.JSONDecodeError, TypeError):
-                pass
-            return result
+    with get_db_readonly() as conn:
+        row = conn.execute(_SQL_GET_PROJECT, (project_id,)).fetchone()
+    if row:
+        result = dict(row)
+        try:
+            result['configuration'] = _loads(result['configuration'])
+        except (json.JSONDecodeError, TypeError):
+            pass
+        return result
     return None
 
 
+def iter_all_projects() -> Iterator[Dict[str, Any]]:
+    """Yield saved project summaries, most recently updated first"""
+    for row in get_connection().execute(_SQL_ALL_PROJECTS):
+        yield dict(row)
+
+
 def get_all_projects() -> List[Dict[str, Any]]:
     """Get all saved projects"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, name, description, project_type, created_at, updated_at 
-            FROM saved_projects ORDER BY updated_at DESC
-        """)
-        return [dict(row) for row in cursor.fetchall()]
+    return list(iter_all_projects())
 
 
 def update_project(project_id: int, name: str = None, configuration: Dict = None, description: str = None) -> Optional[Dict[str, Any]]:
@@ -318,7 +812,7 @@ def update_project(project_id: int, name: str = None, configuration: Dict = None
         values.append(name)
     if configuration:
         updates.append("configuration = ?")
-        values.append(json.dumps(configuration))
+        values.append(_dumps(configuration))
     if description is not None:
         updates.append("description = ?")
         values.append(description)
@@ -330,10 +824,7 @@ def update_project(project_id: int, name: str = None, configuration: Dict = None
     values.append(project_id)
     
     with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            UPDATE saved_projects SET {", ".join(updates)} WHERE id = ?
-        """, values)
+        conn.execute(f"UPDATE saved_projects SET {', '.join(updates)} WHERE id = ?", values)
     
     return get_project(project_id)
 
@@ -341,11 +832,4 @@ def update_project(project_id: int, name: str = None, configuration: Dict = None
 def delete_project(project_id: int) -> bool:
     """Delete a saved project"""
     with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM saved_projects WHERE id = ?", (project_id,))
-        return cursor.rowcount > 0
-
-
-# Initialize database on import
-init_db()
-init_projects_table()
+        return conn.execute(_SQL_DELETE_PROJECT, (project_id,)).rowcount > 0
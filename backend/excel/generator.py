@@ -8,15 +8,122 @@ from openpyxl import Workbook
 from openpyxl.styles import (
     Font, PatternFill, Border, Side, Alignment, NamedStyle,
 )
-from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter, column_index_from_string, quote_sheetname
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.dimensions import ColumnDimension
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.chart import LineChart, BarChart, Reference
-from typing import Dict, Any, List, Optional
+from openpyxl.chart.series import SeriesLabel
+from openpyxl.formatting.rule import ColorScaleRule
+from openpyxl.xml import LXML
+from typing import Dict, Any, List, Optional, Union, BinaryIO
 from datetime import datetime
+from copy import copy
 import os
+import re
 import logging
 
 logger = logging.getLogger(__name__)
 
+# openpyxl streams write-only sheets through lxml's xmlfile when it is installed
+if not LXML:
+    logger.warning("lxml not installed. Excel saves will use the slower stdlib XML writer. Run: pip install lxml")
+
+# Column letters indexed by column number (_COLS[3] == 'C'); openpyxl's
+# get_column_letter does the same lookup behind a call and a try/except
+_COLS = ('',) + tuple(get_column_letter(i) for i in range(1, 128))
+
+# Runs of characters allowed in defined names; anything else separates words
+_NAME_PARTS = re.compile(r'[A-Za-z0-9]+')
+
+# Single-pass replacements for assumption labels (defined names / API slugs)
+_RANGE_NAME_TABLE = str.maketrans({' ': '_', '%': 'Pct', '/': '_', '&': 'And', '(': None, ')': None})
+_SLUG_TABLE = str.maketrans({' ': '_', '/': '_', '&': 'and', '(': None, ')': None, '%': 'percent'})
+
+# Sheets the generator builds; a template's copies of these are replaced
+_MODEL_SHEETS = (
+    'Summary', 'Assumptions', 'Income_Statement', 'Balance_Sheet', 'Cash_Flow',
+    'Valuation', 'Comps', 'Sensitivity', 'Scenarios', 'Dashboard',
+)
+
+# Base-year balance sheet lines as a share of base total assets
+_BS_SEEDS = {
+    'cash': 0.1,
+    'other_ca': 0.05,
+    'ppe_gross': 0.6,
+    'accum_dep': -0.2,
+    'other_nca': 0.1,
+    'accrued': 0.03,
+    'st_debt': 0.05,
+    'lt_debt': 0.25,
+    'other_ncl': 0.02,
+    'share_cap': 0.2,
+    'retained': 0.45,
+}
+
+# Balance sheet lines carried forward from their seed at a flat yearly factor
+_BS_ROLL_FORWARD = {
+    'other_ca': 1.02,
+    'other_nca': 1.01,
+    'accrued': 1.02,
+    'st_debt': 1.0,
+    'lt_debt': 1.0,
+    'other_ncl': 1.01,
+    'share_cap': 1.0,
+}
+
+# Assumptions sheet layout: (label, unit, description, key into the resolved
+# values). Section headers have no key; empty labels are spacer rows.
+_ASSUMPTION_ROWS = (
+    ("GROWTH ASSUMPTIONS", None, None, None),
+    ("Revenue Growth Rate", "percent", "From Damodaran industry data", "revenue_growth"),
+    ("Volume Growth", "percent", "Estimated 60% of revenue growth", "volume_growth"),
+    ("Price Inflation", "percent", "Estimated 40% of revenue growth", "price_inflation"),
+    ("", None, None, None),
+    ("MARGIN ASSUMPTIONS (Real Data)", None, None, None),
+    ("Gross Margin", "percent", "From company financials", "gross_margin"),
+    ("EBITDA Margin", "percent", "From company financials", "ebitda_margin"),
+    ("Operating Margin", "percent", "EBIT/Revenue", "operating_margin"),
+    ("Net Margin", "percent", "From company financials", "net_margin"),
+    ("SG&A as % of Revenue", "percent", "Calculated from margins", "sga_pct"),
+    ("", None, None, None),
+    ("WORKING CAPITAL", None, None, None),
+    ("Receivable Days", "days", "DSO - industry standard", "recv_days"),
+    ("Inventory Days", "days", "DIO - industry standard", "inv_days"),
+    ("Payable Days", "days", "DPO - industry standard", "pay_days"),
+    ("", None, None, None),
+    ("CAPEX & D&A (Damodaran)", None, None, None),
+    ("Capex % of Revenue", "percent", "Damodaran industry data", "capex_pct"),
+    ("D&A % of Gross PPE", "percent", "Derived from capex/depreciation ratio", "da_pct"),
+    ("", None, None, None),
+    ("DEBT ASSUMPTIONS", None, None, None),
+    ("Cost of Debt", "percent", "Damodaran industry WACC", "cost_of_debt"),
+    ("Debt/Equity Ratio", "ratio", "From Damodaran", "debt_equity"),
+    ("", None, None, None),
+    ("VALUATION INPUTS (Damodaran)", None, None, None),
+    ("Risk-free Rate", "percent", "India 10Y G-Sec from Damodaran", "risk_free"),
+    ("Equity Risk Premium", "percent", "India ERP from Damodaran", "erp"),
+    ("Beta", "ratio", "From Yahoo Finance/Damodaran", "beta"),
+    ("Cost of Equity", "percent", "CAPM: Rf + β × ERP", "cost_of_equity"),
+    ("Terminal Growth Rate", "percent", "Conservative long-term GDP growth", "terminal_growth"),
+    ("Tax Rate", "percent", "India corporate tax from Damodaran", "tax_rate"),
+    ("", None, None, None),
+    ("COMPANY DATA (Screener.in + Yahoo)", None, None, None),
+    ("Shares Outstanding (Cr)", "number", "From Yahoo Finance", "shares"),
+    ("Current Price (₹)", "currency", "Live market price", "current_price"),
+    ("Market Cap (₹ Cr)", "number", "Market capitalization", "market_cap"),
+    ("", None, None, None),
+    ("KEY RATIOS (Screener.in Real)", None, None, None),
+    ("Stock P/E", "ratio", "From Screener.in", "pe_ratio"),
+    ("Price to Book", "ratio", "From Screener.in", "pb_ratio"),
+    ("ROCE (%)", "percent", "Return on Capital Employed - Screener.in", "roce"),
+    ("ROE (%)", "percent", "Return on Equity - Screener.in", "roe"),
+    ("Book Value (₹)", "currency", "From Screener.in", "book_value"),
+    ("Face Value (₹)", "currency", "From Screener.in", "face_value"),
+    ("Dividend Yield (%)", "percent", "From Yahoo Finance", "dividend_yield"),
+)
+
 
 class ExcelStyler:
     """Professional Excel styles"""
@@ -33,15 +140,17 @@ class ExcelStyler:
         'dark_grey': '404040',
     }
     
+    # Style key -> NamedStyle prototype, built on first use and shared across workbooks
+    _STYLE_CACHE: Dict[str, NamedStyle] = {}
+    
     @classmethod
-    def create_styles(cls, wb: Workbook) -> Dict[str, NamedStyle]:
+    def _build_styles(cls) -> Dict[str, NamedStyle]:
         styles = {}
         
         # Title
         title = NamedStyle(name='title')
         title.font = Font(name='Calibri', size=16, bold=True, color=cls.COLORS['primary'])
         title.alignment = Alignment(horizontal='left', vertical='center')
-        wb.add_named_style(title)
         styles['title'] = title
         
         # Header
@@ -50,7 +159,6 @@ class ExcelStyler:
         header.fill = PatternFill(start_color=cls.COLORS['header'], end_color=cls.COLORS['header'], fill_type='solid')
         header.alignment = Alignment(horizontal='center', vertical='center')
         header.border = Border(bottom=Side(style='thin', color=cls.COLORS['black']))
-        wb.add_named_style(header)
         styles['header'] = header
         
         # Subheader
@@ -58,7 +166,6 @@ class ExcelStyler:
         subheader.font = Font(name='Calibri', size=10, bold=True, color=cls.COLORS['primary'])
         subheader.fill = PatternFill(start_color=cls.COLORS['grey'], end_color=cls.COLORS['grey'], fill_type='solid')
         subheader.alignment = Alignment(horizontal='left', vertical='center')
-        wb.add_named_style(subheader)
         styles['subheader'] = subheader
         
         # Input (yellow)
@@ -72,7 +179,6 @@ class ExcelStyler:
             bottom=Side(style='thin', color=cls.COLORS['grey'])
         )
         input_cell.alignment = Alignment(horizontal='right')
-        wb.add_named_style(input_cell)
         styles['input'] = input_cell
         
         # Output (green)
@@ -80,14 +186,12 @@ class ExcelStyler:
         output_cell.font = Font(name='Calibri', size=10, color=cls.COLORS['dark_grey'])
         output_cell.fill = PatternFill(start_color=cls.COLORS['output'], end_color=cls.COLORS['output'], fill_type='solid')
         output_cell.alignment = Alignment(horizontal='right')
-        wb.add_named_style(output_cell)
         styles['output'] = output_cell
         
         # Label
         label = NamedStyle(name='label')
         label.font = Font(name='Calibri', size=10)
         label.alignment = Alignment(horizontal='left', indent=1)
-        wb.add_named_style(label)
         styles['label'] = label
         
         # Total
@@ -98,10 +202,31 @@ class ExcelStyler:
             bottom=Side(style='double', color=cls.COLORS['black'])
         )
         total.alignment = Alignment(horizontal='right')
-        wb.add_named_style(total)
         styles['total'] = total
         
         return styles
+    
+    @classmethod
+    def create_styles(cls, wb: Workbook) -> Dict[str, NamedStyle]:
+        if not cls._STYLE_CACHE:
+            cls._STYLE_CACHE.update(cls._build_styles())
+        
+        styles = {}
+        for key, proto in cls._STYLE_CACHE.items():
+            # Templates may already carry these styles
+            if proto.name in wb.named_styles:
+                styles[key] = wb._named_styles[proto.name]
+                continue
+            
+            # A NamedStyle binds to one workbook, so wrap the shared parts in a fresh one
+            style = NamedStyle(
+                name=proto.name, font=proto.font, fill=proto.fill, border=proto.border,
+                alignment=proto.alignment, number_format=proto.number_format, protection=proto.protection
+            )
+            wb.add_named_style(style)
+            styles[key] = style
+        
+        return styles
 
 
 class FinancialModelGenerator:
@@ -115,6 +240,17 @@ class FinancialModelGenerator:
         'ratio': '0.00x',
     }
     
+    # Font overrides shared by every cell that uses them (style objects are immutable)
+    FONTS = {
+        'bold': Font(bold=True),
+        'note': Font(italic=True, size=9, color='666666'),
+        'link': Font(color='0563C1', underline='single'),
+        'source': Font(italic=True, color='666666'),
+        'hint': Font(italic=True, color='1F4E79'),
+        'subtitle': Font(size=12, color='666666'),
+        'dated': Font(italic=True, size=10),
+    }
+    
     def __init__(
         self,
         company_name: str,
@@ -132,13 +268,16 @@ class FinancialModelGenerator:
             try:
                 logger.info(f"Loading template from {template_path}")
                 self.wb = openpyxl.load_workbook(template_path, keep_vba=True)
+                self._clear_template_sheets()
                 self.styles = ExcelStyler.create_styles(self.wb) # Re-register styles if needed
             except Exception as e:
                 logger.error(f"Failed to load template {template_path}: {e}")
-                self.wb = Workbook()
+                self.wb = Workbook(write_only=True)
                 self.styles = ExcelStyler.create_styles(self.wb)
         else:
-            self.wb = Workbook()
+            # Write-only workbooks stream rows to disk, so every sheet must be
+            # emitted top to bottom through _write_row
+            self.wb = Workbook(write_only=True)
             self.styles = ExcelStyler.create_styles(self.wb)
         
         # Config
@@ -149,12 +288,21 @@ class FinancialModelGenerator:
         # Store row mappings for cross-sheet references
         self.row_map = {}
         
+        # Next unwritten row per sheet title
+        self._next_row = {}
+        
+        # (style, number_format, font) -> resolved StyleArray, see _cell
+        self._style_cache = {}
+        
+        # (statement, key) -> historical series in Crores, see _get_historical_value
+        self._hist_cache = {}
+        
         # Store calculated data for API return
         self.final_assumptions = {}
         self.valuation_summary = {}
     
-    def generate(self, output_path: str) -> str:
-        """Generate complete Excel model"""
+    def generate(self, output_path: Union[str, BinaryIO]) -> str:
+        """Generate complete Excel model to a file path or a binary file-like object"""
         if 'Sheet' in self.wb.sheetnames:
             del self.wb['Sheet']
         
@@ -170,9 +318,11 @@ class FinancialModelGenerator:
         self._create_dashboard()
         self._create_summary()
         
-        # Save
-        os.makedirs(os.path.dirname(output_path), exist_ok=True) if os.path.dirname(output_path) else None
-        self.wb.save(output_path)
+        # Save (file-like targets such as BytesIO are written as-is)
+        if isinstance(output_path, (str, os.PathLike)):
+            out_dir = os.path.dirname(output_path)
+            if out_dir and not os.path.isdir(out_dir):
+                os.makedirs(out_dir, exist_ok=True)
         self.wb.save(output_path)
         logger.info(f"Generated: {output_path}")
         
@@ -185,49 +335,127 @@ class FinancialModelGenerator:
             "assumptions": self.final_assumptions
         }
     
-    def _setup_sheet(self, name: str, title: str) -> tuple:
-        """Setup a sheet with headers"""
-        ws = self.wb.create_sheet(name)
+    def _clear_template_sheets(self) -> None:
+        """Drop a template's copies of the model sheets and the names pointing into them"""
+        for name in _MODEL_SHEETS:
+            if name in self.wb.sheetnames:
+                del self.wb[name]
+        
+        for name, defn in list(self.wb.defined_names.items()):
+            if any(sheet in _MODEL_SHEETS for sheet, _ in defn.destinations):
+                del self.wb.defined_names[name]
+    
+    def _create_sheet(self, name: str, index: Optional[int] = None):
+        """Create a sheet, refusing a renamed one (e.g. Summary1) that formulas would miss"""
+        ws = self.wb.create_sheet(name, index)
+        if ws.title != name:
+            raise ValueError(f"Sheet {name} already exists in the workbook (created {ws.title})")
+        return ws
+    
+    def _setup_sheet(self, name: str, title: str, widths: Optional[Dict[str, float]] = None):
+        """Setup a sheet with headers; widths are fixed once the first row is written
+
+        Width keys are a column letter or a "C:L" span, written as one <col> element.
+        """
+        ws = self._create_sheet(name)
         ws.column_dimensions['A'].width = 3
         ws.column_dimensions['B'].width = 32
+        for cols, width in (widths or {}).items():
+            first, _, last = cols.partition(':')
+            ws.column_dimensions[first] = ColumnDimension(
+                ws, index=first, width=width,
+                min=column_index_from_string(first), max=column_index_from_string(last or first),
+            )
         
-        ws['B2'] = title
-        ws['B2'].style = 'title'
+        self._write_row(ws, 2, [None, self._cell(ws, title, style='title')])
         
         return ws
     
+    def _cell(self, ws, value=None, style: Optional[str] = None,
+              number_format: Optional[str] = None, font: Optional[Font] = None):
+        """Build a detached cell; the named style is applied before format and font"""
+        cell = WriteOnlyCell(ws, value=value)
+        if style is None and number_format is None and font is None:
+            return cell
+        
+        # Resolve each style combination against the workbook stylesheet once,
+        # then hand every later cell a copy of the resulting style ids
+        key = (style, number_format, font)
+        style_array = self._style_cache.get(key)
+        if style_array is None:
+            if style:
+                cell.style = style
+            if number_format:
+                cell.number_format = number_format
+            if font:
+                cell.font = font
+            self._style_cache[key] = copy(cell._style)
+        else:
+            cell._style = copy(style_array)
+        return cell
+    
+    def _write_row(self, ws, row: int, cells: List[Any]) -> None:
+        """Append cells (starting at column A) at the given row, padding skipped rows"""
+        next_row = self._next_row.get(ws.title, 1)
+        if row < next_row:
+            raise ValueError(f"{ws.title} row {row} is already written")
+        for _ in range(row - next_row):
+            ws.append([])
+        ws.append(cells)
+        self._next_row[ws.title] = row + 1
+    
+    def _merge_row(self, ws, row: int, first_col: str, last_col: str) -> None:
+        """Merge first_col:last_col on one row without parsing a range string"""
+        ws.merged_cells.add(CellRange(
+            min_col=column_index_from_string(first_col), min_row=row,
+            max_col=column_index_from_string(last_col), max_row=row,
+        ))
+    
+    def _year_columns(self, start_col: int = 3) -> List[tuple]:
+        """(column, previous column) letters for every historical and forecast year"""
+        cols = [_COLS[start_col + i] for i in range(self.hist_years + self.fcst_years)]
+        return list(zip(cols, [None] + cols[:-1]))
+    
+    def _year_widths(self, start_col: int = 3) -> Dict[str, float]:
+        """Column widths for the year header columns"""
+        year_cols = self._year_columns(start_col)
+        return {f"{year_cols[0][0]}:{year_cols[-1][0]}": 13}
+    
     def _add_year_headers(self, ws, row: int, start_col: int = 3) -> None:
         """Add year headers from historical to forecast"""
+        cells = [None] * (start_col - 1)
+        
         # Historical years
         for i in range(self.hist_years):
-            col = get_column_letter(start_col + i)
             year = self.base_year - self.hist_years + i
-            ws[f'{col}{row}'] = f"FY{year}"
-            ws[f'{col}{row}'].style = 'header'
-            ws.column_dimensions[col].width = 13
+            cells.append(self._cell(ws, f"FY{year}", style='header'))
         
         # Forecast years
         for i in range(self.fcst_years):
-            col = get_column_letter(start_col + self.hist_years + i)
             year = self.base_year + i
-            ws[f'{col}{row}'] = f"FY{year}E"
-            ws[f'{col}{row}'].style = 'header'
-            ws.column_dimensions[col].width = 13
+            cells.append(self._cell(ws, f"FY{year}E", style='header'))
+        
+        self._write_row(ws, row, cells)
     
     def _get_historical_value(self, statement: str, key: str, year_idx: int) -> Optional[float]:
         """Get historical value from data"""
-        data = self.data.get(statement, {})
-        historical = data.get('historical', [])
+        column = self._hist_cache.get((statement, key))
+        if column is None:
+            # Convert the whole series to Crores once per (statement, key)
+            historical = self.data.get(statement, {}).get('historical', [])
+            column = tuple(
+                row.get(key) / 10000000 if row.get(key) else None
+                for row in historical
+            )
+            self._hist_cache[(statement, key)] = column
         
-        if year_idx < len(historical):
-            val = historical[year_idx].get(key)
-            if val:
-                return val / 10000000  # Convert to Crores
+        if year_idx < len(column):
+            return column[year_idx]
         return None
     
     def _create_assumptions(self) -> None:
         """Create assumptions sheet with real company and industry data"""
-        ws = self._setup_sheet("Assumptions", "Model Assumptions")
+        ws = self._setup_sheet("Assumptions", "Model Assumptions", {'C': 14, 'D': 10, 'E': 32})
         
         # Extract real data from sources
         company_info = self.data.get('company_info', {})
@@ -288,104 +516,83 @@ class FinancialModelGenerator:
         # Data source note
         data_source = self.data.get('data_source', 'Yahoo Finance + Screener.in + Damodaran')
         
-        ws['B4'] = f"Data Sources: {data_source}"
-        ws['B4'].font = Font(italic=True, color='666666')
-        ws['B5'] = "Yellow cells are inputs - modify to update projections"
-        ws['B5'].font = Font(italic=True, color='1F4E79')
+        self._write_row(ws, 4, [None, self._cell(ws, f"Data Sources: {data_source}", font=self.FONTS['source'])])
+        self._write_row(ws, 5, [None, self._cell(ws, "Yellow cells are inputs - modify to update projections", font=self.FONTS['hint'])])
         
         row = 7
         
-        # Define all assumptions with REAL values from data
-        assumptions = [
-            ("GROWTH ASSUMPTIONS", None, None, None),
-            ("Revenue Growth Rate", revenue_growth, "percent", f"From Damodaran industry data"),
-            ("Volume Growth", revenue_growth * 0.6, "percent", "Estimated 60% of revenue growth"),
-            ("Price Inflation", revenue_growth * 0.4, "percent", "Estimated 40% of revenue growth"),
-            ("", None, None, None),
-            ("MARGIN ASSUMPTIONS (Real Data)", None, None, None),
-            ("Gross Margin", gross_margin, "percent", "From company financials"),
-            ("EBITDA Margin", ebitda_margin, "percent", "From company financials"),
-            ("Operating Margin", operating_margin, "percent", "EBIT/Revenue"),
-            ("Net Margin", net_margin, "percent", "From company financials"),
-            ("SG&A as % of Revenue", max(gross_margin - ebitda_margin - 0.02, 0.05), "percent", "Calculated from margins"),
-            ("", None, None, None),
-            ("WORKING CAPITAL", None, None, None),
-            ("Receivable Days", 45, "days", "DSO - industry standard"),
-            ("Inventory Days", 30, "days", "DIO - industry standard"),
-            ("Payable Days", 60, "days", "DPO - industry standard"),
-            ("", None, None, None),
-            ("CAPEX & D&A (Damodaran)", None, None, None),
-            ("Capex % of Revenue", capex_pct, "percent", f"Damodaran industry data"),
-            ("D&A % of Gross PPE", da_pct, "percent", f"Derived from capex/depreciation ratio"),
-            ("", None, None, None),
-            ("DEBT ASSUMPTIONS", None, None, None),
-            ("Cost of Debt", cost_of_debt, "percent", f"Damodaran industry WACC"),
-            ("Debt/Equity Ratio", debt_ratio / (1 - debt_ratio) if debt_ratio < 1 else 0.5, "ratio", f"From Damodaran"),
-            ("", None, None, None),
-            ("VALUATION INPUTS (Damodaran)", None, None, None),
-            ("Risk-free Rate", risk_free_rate, "percent", "India 10Y G-Sec from Damodaran"),
-            ("Equity Risk Premium", equity_risk_premium, "percent", f"India ERP from Damodaran"),
-            ("Beta", beta, "ratio", f"From Yahoo Finance/Damodaran"),
-            ("Cost of Equity", risk_free_rate + beta * equity_risk_premium, "percent", "CAPM: Rf + β × ERP"),
-            ("Terminal Growth Rate", 0.04, "percent", "Conservative long-term GDP growth"),
-            ("Tax Rate", tax_rate, "percent", "India corporate tax from Damodaran"),
-            ("", None, None, None),
-            ("COMPANY DATA (Screener.in + Yahoo)", None, None, None),
-            ("Shares Outstanding (Cr)", shares, "number", "From Yahoo Finance"),
-            ("Current Price (₹)", company_info.get('current_price', company_info.get('currentPrice', 0)), "currency", "Live market price"),
-            ("Market Cap (₹ Cr)", company_info.get('market_cap', 0), "number", "Market capitalization"),
-            ("", None, None, None),
-            ("KEY RATIOS (Screener.in Real)", None, None, None),
-            ("Stock P/E", company_info.get('stock_p/e', company_info.get('pe_ratio', 0)), "ratio", "From Screener.in"),
-            ("Price to Book", company_info.get('pb_ratio', company_info.get('price_to_book', 0)), "ratio", "From Screener.in"),
-            ("ROCE (%)", company_info.get('roce', 0), "percent", "Return on Capital Employed - Screener.in"),
-            ("ROE (%)", company_info.get('roe', company_info.get('return_on_equity', 0)), "percent", "Return on Equity - Screener.in"),
-            ("Book Value (₹)", company_info.get('book_value', 0), "currency", "From Screener.in"),
-            ("Face Value (₹)", company_info.get('face_value', 10), "currency", "From Screener.in"),
-            ("Dividend Yield (%)", company_info.get('dividend_yield', 0), "percent", "From Yahoo Finance"),
-        ]
+        # Every assumption value, resolved once from the fallback chains above
+        resolved = {
+            'revenue_growth': revenue_growth,
+            'volume_growth': revenue_growth * 0.6,
+            'price_inflation': revenue_growth * 0.4,
+            'gross_margin': gross_margin,
+            'ebitda_margin': ebitda_margin,
+            'operating_margin': operating_margin,
+            'net_margin': net_margin,
+            'sga_pct': max(gross_margin - ebitda_margin - 0.02, 0.05),
+            'capex_pct': capex_pct,
+            'da_pct': da_pct,
+            'cost_of_debt': cost_of_debt,
+            'debt_equity': debt_ratio / (1 - debt_ratio) if debt_ratio < 1 else 0.5,
+            'risk_free': risk_free_rate,
+            'erp': equity_risk_premium,
+            'beta': beta,
+            'cost_of_equity': risk_free_rate + beta * equity_risk_premium,
+            'tax_rate': tax_rate,
+            'terminal_growth': 0.04,
+            'recv_days': 45,
+            'inv_days': 30,
+            'pay_days': 60,
+            'shares': shares,
+            'current_price': company_info.get('current_price', company_info.get('currentPrice', 0)),
+            'market_cap': company_info.get('market_cap', 0),
+            'pe_ratio': company_info.get('stock_p/e', company_info.get('pe_ratio', 0)),
+            'pb_ratio': company_info.get('pb_ratio', company_info.get('price_to_book', 0)),
+            'roce': company_info.get('roce', 0),
+            'roe': company_info.get('roe', company_info.get('return_on_equity', 0)),
+            'book_value': company_info.get('book_value', 0),
+            'face_value': company_info.get('face_value', 10),
+            'dividend_yield': company_info.get('dividend_yield', 0),
+        }
         
-        for item in assumptions:
-            name, value, unit, desc = item
-            
+        # Units without a dedicated format ("days", "number") fall back to plain numbers
+        unit_formats = {
+            'percent': self.FORMATS['percent'],
+            'ratio': self.FORMATS['ratio'],
+            'currency': self.FORMATS['currency'],
+        }
+        
+        # (range_name, label, row) for each input, registered once all rows are out
+        named_rows = []
+        
+        # Lay out the assumptions table with REAL values from data
+        for name, unit, desc, key in _ASSUMPTION_ROWS:
             if not name:
                 row += 1
                 continue
             
-            if value is None:  # Section header
-                ws[f'B{row}'] = name
-                ws[f'B{row}'].style = 'subheader'
-                ws.merge_cells(f'B{row}:E{row}')
+            if key is None:  # Section header
+                self._write_row(ws, row, [None, self._cell(ws, name, style='subheader')])
+                self._merge_row(ws, row, 'B', 'E')
             else:
-                ws[f'B{row}'] = name
-                ws[f'B{row}'].style = 'label'
-                
-                ws[f'C{row}'] = value
-                ws[f'C{row}'].style = 'input_cell'
+                value = resolved[key]
+                fmt = unit_formats.get(unit, self.FORMATS['number'])
                 
-                if unit == 'percent':
-                    ws[f'C{row}'].number_format = self.FORMATS['percent']
-                elif unit == 'ratio':
-                    ws[f'C{row}'].number_format = self.FORMATS['ratio']
-                elif unit == 'currency':
-                    ws[f'C{row}'].number_format = self.FORMATS['currency']
-                else:
-                    ws[f'C{row}'].number_format = self.FORMATS['number']
-                
-                ws[f'D{row}'] = unit if unit else ""
-                ws[f'E{row}'] = desc if desc else ""
-                ws[f'E{row}'].font = Font(italic=True, size=9, color='666666')
+                self._write_row(ws, row, [
+                    None,
+                    self._cell(ws, name, style='label'),
+                    self._cell(ws, value, style='input_cell', number_format=fmt),
+                    self._cell(ws, unit if unit else ""),
+                    self._cell(ws, desc if desc else "", font=self.FONTS['note']),
+                ])
                 
                 # Create named range (sanitize name)
-                range_name = name.replace(' ', '_').replace('%', 'Pct').replace('/', '_').replace('&', 'And').replace('(', '').replace(')', '')
-                try:
-                    self.wb.create_named_range(range_name, ws, f'$C${row}')
-                    self.row_map[name] = row
-                except:
-                    pass
+                range_name = '_'.join(_NAME_PARTS.findall(name.translate(_RANGE_NAME_TABLE)))
+                named_rows.append((range_name, name, row))
                 
                 # Store for API return
-                slug = name.lower().replace(' ', '_').replace('/', '_').replace('&', 'and').replace('(', '').replace(')', '').replace('%', 'percent')
+                slug = name.lower().translate(_SLUG_TABLE)
                 # Handle specific keys expected by tornado_analysis
                 if "revenue_growth" in slug: self.final_assumptions['revenue_growth'] = value
                 elif "ebitda_margin" in slug: self.final_assumptions['ebitda_margin'] = value
@@ -399,6 +606,14 @@ class FinancialModelGenerator:
             
             row += 1
         
+        sheet_ref = quote_sheetname(ws.title)
+        for range_name, name, name_row in named_rows:
+            # Defined names must start with a letter and be unique
+            if not range_name[:1].isalpha() or range_name in self.wb.defined_names:
+                continue
+            self.wb.defined_names.add(DefinedName(range_name, attr_text=f"{sheet_ref}!$C${name_row}"))
+            self.row_map[name] = name_row
+        
         # Store assumption rows for formula references (updated row numbers)
         self.assum_rows = {
             'rev_growth': 8, 'gross_margin': 14, 'ebitda_margin': 15, 'operating_margin': 16,
@@ -410,15 +625,10 @@ class FinancialModelGenerator:
             'terminal_growth': 38, 'tax_rate': 39,
             'shares': 42, 'current_price': 43, 'market_cap': 44
         }
-        
-        ws.column_dimensions['C'].width = 14
-        ws.column_dimensions['D'].width = 10
-        ws.column_dimensions['E'].width = 32
-
     
     def _create_income_statement(self) -> None:
         """Create income statement with linked formulas"""
-        ws = self._setup_sheet("Income_Statement", "Income Statement (₹ Crores)")
+        ws = self._setup_sheet("Income_Statement", "Income Statement (₹ Crores)", self._year_widths())
         
         row = 4
         self._add_year_headers(ws, row)
@@ -470,6 +680,9 @@ class FinancialModelGenerator:
             'net_income': base_net_income,
         }
         
+        # Column letters for each year alongside the prior year's column
+        year_cols = self._year_columns()
+        
         # Row tracking for formula references
         rows = {}
         
@@ -499,120 +712,71 @@ class FinancialModelGenerator:
             ("Net Margin %", None, False),
         ]
         
+        num = self.FORMATS['number']
+        pct = self.FORMATS['percent']
+        
+        # Assumption rows the formulas point at
+        a_rev = self.assum_rows['rev_growth']
+        a_gm = self.assum_rows['gross_margin']
+        a_sga = self.assum_rows['sga_pct']
+        a_da = self.assum_rows['da_pct']
+        a_tax = self.assum_rows['tax_rate']
+        
+        # Line item key (label for margin rows) -> (cell builder, number format, style).
+        # Builders take (year index, column, previous column, row); `rows` fills in as
+        # items are written, so each builder only refers to rows above it.
+        handlers = {
+            'revenue': (lambda i, col, prev_col, row: base_revenue if i == 0 else f"=IFERROR({prev_col}{row}*(1+Assumptions!$C${a_rev}),0)", num, None),
+            'Growth %': (lambda i, col, prev_col, row: f"=IFERROR({col}{row-1}/{prev_col}{row-1}-1,0)" if i > 0 else None, pct, None),
+            'cogs': (lambda i, col, prev_col, row: f"=IFERROR(-{col}{rows['revenue']}*(1-Assumptions!$C${a_gm}),0)", num, None),
+            'gross': (lambda i, col, prev_col, row: f"={col}{rows['revenue']}+{col}{rows['cogs']}", num, None),
+            'Gross Margin %': (lambda i, col, prev_col, row: f"=IFERROR({col}{row-1}/{col}{rows['revenue']},0)", pct, None),
+            'sga': (lambda i, col, prev_col, row: f"=IFERROR(-{col}{rows['revenue']}*Assumptions!$C${a_sga},0)", num, None),
+            'other_opex': (lambda i, col, prev_col, row: f"=-{col}{rows['revenue']}*0.02", num, None),
+            'ebitda': (lambda i, col, prev_col, row: f"={col}{rows['gross']}+{col}{rows['sga']}+{col}{rows['other_opex']}", num, 'output_cell'),
+            'EBITDA Margin %': (lambda i, col, prev_col, row: f"=IFERROR({col}{row-1}/{col}{rows['revenue']},0)", pct, None),
+            'da': (lambda i, col, prev_col, row: f"=IFERROR(-{col}{rows['revenue']}*Assumptions!$C${a_da},0)", num, None),
+            'ebit': (lambda i, col, prev_col, row: f"={col}{rows['ebitda']}+{col}{rows['da']}", num, None),
+            'EBIT Margin %': (lambda i, col, prev_col, row: f"=IFERROR({col}{row-1}/{col}{rows['revenue']},0)", pct, None),
+            # Placeholder - will link to BS debt balance
+            'interest': (lambda i, col, prev_col, row: f"=-{col}{rows['revenue']}*0.02", num, None),
+            'pbt': (lambda i, col, prev_col, row: f"={col}{rows['ebit']}+{col}{rows['interest']}", num, None),
+            'tax': (lambda i, col, prev_col, row: f"=IFERROR(-MAX({col}{rows['pbt']},0)*Assumptions!$C${a_tax},0)", num, None),
+            'net_income': (lambda i, col, prev_col, row: f"={col}{rows['pbt']}+{col}{rows['tax']}", num, 'output_cell'),
+            'Net Margin %': (lambda i, col, prev_col, row: f"=IFERROR({col}{row-1}/{col}{rows['revenue']},0)", pct, None),
+        }
+        
         for item_name, key, is_bold in items:
             if not item_name:
                 row += 1
                 continue
             
-            ws[f'B{row}'] = item_name
-            ws[f'B{row}'].style = 'label'
-            if is_bold:
-                ws[f'B{row}'].font = Font(bold=True)
+            cells = [None, self._cell(ws, item_name, style='label', font=self.FONTS['bold'] if is_bold else None)]
             
             if key:
                 rows[key] = row
             
             # Fill in values
-            total_years = self.hist_years + self.fcst_years
-            
-            for i in range(total_years):
-                col = get_column_letter(3 + i)
-                prev_col = get_column_letter(2 + i) if i > 0 else None
-                
-                is_forecast = i >= self.hist_years
-                
-                if key == 'revenue':
-                    if i == 0:
-                        ws[f'{col}{row}'] = base_revenue
-                    else:
-                        a_row = self.assum_rows['rev_growth']
-                        ws[f'{col}{row}'] = f"=IFERROR({prev_col}{row}*(1+Assumptions!$C${a_row}),0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif item_name == 'Growth %':
-                    if i > 0:
-                        ws[f'{col}{row}'] = f"=IFERROR({col}{row-1}/{prev_col}{row-1}-1,0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['percent']
-                    
-                elif key == 'cogs':
-                    a_row = self.assum_rows['gross_margin']
-                    ws[f'{col}{row}'] = f"=IFERROR(-{col}{rows['revenue']}*(1-Assumptions!$C${a_row}),0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'gross':
-                    ws[f'{col}{row}'] = f"={col}{rows['revenue']}+{col}{rows['cogs']}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif item_name == 'Gross Margin %':
-                    ws[f'{col}{row}'] = f"=IFERROR({col}{row-1}/{col}{rows['revenue']},0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['percent']
-                    
-                elif key == 'sga':
-                    a_row = self.assum_rows['sga_pct']
-                    ws[f'{col}{row}'] = f"=IFERROR(-{col}{rows['revenue']}*Assumptions!$C${a_row},0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'other_opex':
-                    ws[f'{col}{row}'] = f"=-{col}{rows['revenue']}*0.02"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'ebitda':
-                    ws[f'{col}{row}'] = f"={col}{rows['gross']}+{col}{rows['sga']}+{col}{rows['other_opex']}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    ws[f'{col}{row}'].style = 'output_cell'
-                    
-                elif item_name == 'EBITDA Margin %':
-                    ws[f'{col}{row}'] = f"=IFERROR({col}{row-1}/{col}{rows['revenue']},0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['percent']
-                    
-                elif key == 'da':
-                    a_row = self.assum_rows['da_pct']
-                    ws[f'{col}{row}'] = f"=IFERROR(-{col}{rows['revenue']}*Assumptions!$C${a_row},0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'ebit':
-                    ws[f'{col}{row}'] = f"={col}{rows['ebitda']}+{col}{rows['da']}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif item_name == 'EBIT Margin %':
-                    ws[f'{col}{row}'] = f"=IFERROR({col}{row-1}/{col}{rows['revenue']},0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['percent']
-                    
-                elif key == 'interest':
-                    # Link to balance sheet for debt balance
-                    ws[f'{col}{row}'] = f"=-{col}{rows['revenue']}*0.02"  # Placeholder - will link to BS
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'pbt':
-                    ws[f'{col}{row}'] = f"={col}{rows['ebit']}+{col}{rows['interest']}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'tax':
-                    a_row = self.assum_rows['tax_rate']
-                    ws[f'{col}{row}'] = f"=IFERROR(-MAX({col}{rows['pbt']},0)*Assumptions!$C${a_row},0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'net_income':
-                    ws[f'{col}{row}'] = f"={col}{rows['pbt']}+{col}{rows['tax']}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    ws[f'{col}{row}'].style = 'output_cell'
-                    
-                elif item_name == 'Net Margin %':
-                    ws[f'{col}{row}'] = f"=IFERROR({col}{row-1}/{col}{rows['revenue']},0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['percent']
+            build, fmt, style = handlers[key or item_name]
+            for i, (col, prev_col) in enumerate(year_cols):
+                cells.append(self._cell(ws, build(i, col, prev_col, row), style=style, number_format=fmt))
             
+            self._write_row(ws, row, cells)
             row += 1
         
         self.row_map['is'] = rows
     
     def _create_balance_sheet(self) -> None:
         """Create balance sheet with linked formulas"""
-        ws = self._setup_sheet("Balance_Sheet", "Balance Sheet (₹ Crores)")
+        ws = self._setup_sheet("Balance_Sheet", "Balance Sheet (₹ Crores)", self._year_widths())
         
         row = 4
         self._add_year_headers(ws, row)
         row += 2
         
+        # Column letters for each year alongside the prior year's column
+        year_cols = self._year_columns()
+        
         rows = {}
         is_rows = self.row_map.get('is', {})
         
@@ -669,172 +833,78 @@ class FinancialModelGenerator:
                 base_revenue = real_financials.get('revenue', 10000) or 10000
                 base_ta = base_revenue * 1.25  # Typical asset turnover
         
+        num = self.FORMATS['number']
+        
+        # Base-year values for the seeded lines
+        seeds = {key: base_ta * share for key, share in _BS_SEEDS.items()}
+        
+        # Assumption rows the formulas point at
+        a_recv = self.assum_rows['recv_days']
+        a_inv = self.assum_rows['inv_days']
+        a_pay = self.assum_rows['pay_days']
+        a_capex = self.assum_rows['capex_pct']
+        
+        # Line item key -> (cell builder, number format, style); builders take
+        # (year index, column, previous column, row) like the income statement's
+        handlers = {
+            # Cash = prior cash + net change in cash from the cash flow statement
+            'cash': (lambda i, col, prev_col, row: seeds['cash'] if i == 0 else f"={prev_col}{row}+Cash_Flow!{col}28", num, None),
+            'ar': (lambda i, col, prev_col, row: f"=IFERROR(Income_Statement!{col}6*Assumptions!$C${a_recv}/365,0)", num, None),
+            'inv': (lambda i, col, prev_col, row: f"=IFERROR(ABS(Income_Statement!{col}9)*Assumptions!$C${a_inv}/365,0)", num, None),
+            'tca': (lambda i, col, prev_col, row: f"=SUM({col}{rows['cash']}:{col}{rows['other_ca']})", num, None),
+            'ppe_gross': (lambda i, col, prev_col, row: seeds['ppe_gross'] if i == 0 else f"=IFERROR({prev_col}{row}+Income_Statement!{col}6*Assumptions!$C${a_capex},{prev_col}{row})", num, None),
+            'accum_dep': (lambda i, col, prev_col, row: seeds['accum_dep'] if i == 0 else f"={prev_col}{row}+Income_Statement!{col}18", num, None),
+            'ppe_net': (lambda i, col, prev_col, row: f"={col}{rows['ppe_gross']}+{col}{rows['accum_dep']}", num, None),
+            'ta': (lambda i, col, prev_col, row: f"={col}{rows['tca']}+{col}{rows['ppe_net']}+{col}{rows['other_nca']}", num, 'output_cell'),
+            'ap': (lambda i, col, prev_col, row: f"=IFERROR(ABS(Income_Statement!{col}9)*Assumptions!$C${a_pay}/365,0)", num, None),
+            'tcl': (lambda i, col, prev_col, row: f"={col}{rows['ap']}+{col}{rows['accrued']}+{col}{rows['st_debt']}", num, None),
+            'tl': (lambda i, col, prev_col, row: f"={col}{rows['tcl']}+{col}{rows['lt_debt']}+{col}{rows['other_ncl']}", num, None),
+            # Retained = prior + net income - dividends
+            'retained': (lambda i, col, prev_col, row: seeds['retained'] if i == 0 else f"={prev_col}{row}+Income_Statement!{col}26-Income_Statement!{col}26*0.2", num, None),
+            'te': (lambda i, col, prev_col, row: f"={col}{rows['share_cap']}+{col}{rows['retained']}", num, None),
+            'tle': (lambda i, col, prev_col, row: f"={col}{rows['tl']}+{col}{rows['te']}", num, 'output_cell'),
+            'check': (lambda i, col, prev_col, row: f"=ROUND({col}{rows['ta']}-{col}{rows['tle']},0)", num, 'output_cell'),
+        }
+        
+        def roll_forward(seed, factor):
+            step = "" if factor == 1.0 else f"*{factor}"
+            return lambda i, col, prev_col, row: seed if i == 0 else f"={prev_col}{row}{step}"
+        
+        for key, factor in _BS_ROLL_FORWARD.items():
+            handlers[key] = (roll_forward(seeds[key], factor), num, None)
+        
         for item_name, key, item_type in items:
             if not item_name:
                 row += 1
                 continue
             
-            ws[f'B{row}'] = item_name
-            
             if item_type == "header":
-                ws[f'B{row}'].style = 'subheader'
+                cells = [None, self._cell(ws, item_name, style='subheader')]
             else:
-                ws[f'B{row}'].style = 'label'
-                if item_type == "total":
-                    ws[f'B{row}'].font = Font(bold=True)
+                cells = [None, self._cell(ws, item_name, style='label', font=self.FONTS['bold'] if item_type == "total" else None)]
             
             if key:
                 rows[key] = row
+                build, fmt, style = handlers[key]
+                for i, (col, prev_col) in enumerate(year_cols):
+                    cells.append(self._cell(ws, build(i, col, prev_col, row), style=style, number_format=fmt))
             
-            total_years = self.hist_years + self.fcst_years
-            
-            for i in range(total_years):
-                col = get_column_letter(3 + i)
-                prev_col = get_column_letter(2 + i) if i > 0 else None
-                is_col = col  # Same column in IS
-                
-                if key == 'cash':
-                    if i == 0:
-                        ws[f'{col}{row}'] = base_ta * 0.1
-                    else:
-                        # Cash = prior cash + net income - capex + depreciation - working capital change
-                        ws[f'{col}{row}'] = f"={prev_col}{row}+Cash_Flow!{col}28"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'ar':
-                    a_row = self.assum_rows['recv_days']
-                    ws[f'{col}{row}'] = f"=IFERROR(Income_Statement!{col}6*Assumptions!$C${a_row}/365,0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'inv':
-                    a_row = self.assum_rows['inv_days']
-                    ws[f'{col}{row}'] = f"=IFERROR(ABS(Income_Statement!{col}9)*Assumptions!$C${a_row}/365,0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'other_ca':
-                    if i == 0:
-                        ws[f'{col}{row}'] = base_ta * 0.05
-                    else:
-                        ws[f'{col}{row}'] = f"={prev_col}{row}*1.02"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'tca':
-                    ws[f'{col}{row}'] = f"=SUM({col}{rows['cash']}:{col}{rows['other_ca']})"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'ppe_gross':
-                    if i == 0:
-                        ws[f'{col}{row}'] = base_ta * 0.6
-                    else:
-                        a_row = self.assum_rows['capex_pct']
-                        ws[f'{col}{row}'] = f"=IFERROR({prev_col}{row}+Income_Statement!{col}6*Assumptions!$C${a_row},{prev_col}{row})"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'accum_dep':
-                    if i == 0:
-                        ws[f'{col}{row}'] = -base_ta * 0.2
-                    else:
-                        ws[f'{col}{row}'] = f"={prev_col}{row}+Income_Statement!{col}18"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'ppe_net':
-                    ws[f'{col}{row}'] = f"={col}{rows['ppe_gross']}+{col}{rows['accum_dep']}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'other_nca':
-                    if i == 0:
-                        ws[f'{col}{row}'] = base_ta * 0.1
-                    else:
-                        ws[f'{col}{row}'] = f"={prev_col}{row}*1.01"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'ta':
-                    ws[f'{col}{row}'] = f"={col}{rows['tca']}+{col}{rows['ppe_net']}+{col}{rows['other_nca']}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    ws[f'{col}{row}'].style = 'output_cell'
-                    
-                elif key == 'ap':
-                    a_row = self.assum_rows['pay_days']
-                    ws[f'{col}{row}'] = f"=IFERROR(ABS(Income_Statement!{col}9)*Assumptions!$C${a_row}/365,0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'accrued':
-                    if i == 0:
-                        ws[f'{col}{row}'] = base_ta * 0.03
-                    else:
-                        ws[f'{col}{row}'] = f"={prev_col}{row}*1.02"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'st_debt':
-                    if i == 0:
-                        ws[f'{col}{row}'] = base_ta * 0.05
-                    else:
-                        ws[f'{col}{row}'] = f"={prev_col}{row}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'tcl':
-                    ws[f'{col}{row}'] = f"={col}{rows['ap']}+{col}{rows['accrued']}+{col}{rows['st_debt']}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'lt_debt':
-                    if i == 0:
-                        ws[f'{col}{row}'] = base_ta * 0.25
-                    else:
-                        ws[f'{col}{row}'] = f"={prev_col}{row}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'other_ncl':
-                    if i == 0:
-                        ws[f'{col}{row}'] = base_ta * 0.02
-                    else:
-                        ws[f'{col}{row}'] = f"={prev_col}{row}*1.01"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'tl':
-                    ws[f'{col}{row}'] = f"={col}{rows['tcl']}+{col}{rows['lt_debt']}+{col}{rows['other_ncl']}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'share_cap':
-                    if i == 0:
-                        ws[f'{col}{row}'] = base_ta * 0.2
-                    else:
-                        ws[f'{col}{row}'] = f"={prev_col}{row}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'retained':
-                    if i == 0:
-                        ws[f'{col}{row}'] = base_ta * 0.45
-                    else:
-                        # Retained = prior + net income - dividends
-                        ws[f'{col}{row}'] = f"={prev_col}{row}+Income_Statement!{col}26-Income_Statement!{col}26*0.2"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'te':
-                    ws[f'{col}{row}'] = f"={col}{rows['share_cap']}+{col}{rows['retained']}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    
-                elif key == 'tle':
-                    ws[f'{col}{row}'] = f"={col}{rows['tl']}+{col}{rows['te']}"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    ws[f'{col}{row}'].style = 'output_cell'
-                    
-                elif key == 'check':
-                    ws[f'{col}{row}'] = f"=ROUND({col}{rows['ta']}-{col}{rows['tle']},0)"
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-                    ws[f'{col}{row}'].style = 'output_cell'
-            
+            self._write_row(ws, row, cells)
             row += 1
         
         self.row_map['bs'] = rows
     
     def _create_cash_flow(self) -> None:
         """Create cash flow statement"""
-        ws = self._setup_sheet("Cash_Flow", "Cash Flow Statement (₹ Crores)")
+        ws = self._setup_sheet("Cash_Flow", "Cash Flow Statement (₹ Crores)", self._year_widths())
         
         row = 4
         self._add_year_headers(ws, row)
         row += 2
         
+        # Column letters for each year alongside the prior year's column
+        year_cols = self._year_columns()
+        
         rows = {}
         is_rows = self.row_map.get('is', {})
         bs_rows = self.row_map.get('bs', {})
@@ -864,108 +934,59 @@ class FinancialModelGenerator:
             ("Closing Cash", "close_cash", "total"),
         ]
         
+        num = self.FORMATS['number']
+        
+        # Line item key -> (cell builder, number format, style), as on the balance sheet
+        handlers = {
+            'ni': (lambda i, col, prev_col, row: f"=IFERROR(Income_Statement!{col}26,0)", num, None),
+            'dep': (lambda i, col, prev_col, row: f"=IFERROR(-Income_Statement!{col}18,0)", num, None),
+            'chg_ar': (lambda i, col, prev_col, row: f"=IFERROR(Balance_Sheet!{prev_col}8-Balance_Sheet!{col}8,0)" if i > 0 else 0, num, None),
+            'chg_inv': (lambda i, col, prev_col, row: f"=IFERROR(Balance_Sheet!{prev_col}9-Balance_Sheet!{col}9,0)" if i > 0 else 0, num, None),
+            'chg_ap': (lambda i, col, prev_col, row: f"=IFERROR(Balance_Sheet!{col}20-Balance_Sheet!{prev_col}20,0)" if i > 0 else 0, num, None),
+            'chg_other': (lambda i, col, prev_col, row: 0, num, None),
+            'ocf': (lambda i, col, prev_col, row: f"=SUM({col}{rows['ni']}:{col}{rows['chg_other']})", num, 'output_cell'),
+            'capex': (lambda i, col, prev_col, row: f"=IFERROR(-Income_Statement!{col}6*Assumptions!$C$21,0)", num, None),
+            'other_inv': (lambda i, col, prev_col, row: 0, num, None),
+            'icf': (lambda i, col, prev_col, row: f"={col}{rows['capex']}+{col}{rows['other_inv']}", num, None),
+            'div': (lambda i, col, prev_col, row: f"=IFERROR(-Income_Statement!{col}26*0.2,0)", num, None),
+            'chg_debt': (lambda i, col, prev_col, row: 0, num, None),
+            'fcf': (lambda i, col, prev_col, row: f"={col}{rows['div']}+{col}{rows['chg_debt']}", num, None),
+            'net_cash': (lambda i, col, prev_col, row: f"={col}{rows['ocf']}+{col}{rows['icf']}+{col}{rows['fcf']}", num, 'output_cell'),
+            # Starting cash in the first year
+            'open_cash': (lambda i, col, prev_col, row: f"=IFERROR(Balance_Sheet!{prev_col}7,0)" if i > 0 else 2000, num, None),
+            'close_cash': (lambda i, col, prev_col, row: f"={col}{rows['open_cash']}+{col}{rows['net_cash']}", num, 'output_cell'),
+        }
+        
         for item_name, key, item_type in items:
             if not item_name:
                 row += 1
                 continue
             
-            ws[f'B{row}'] = item_name
-            
             if item_type == "header":
-                ws[f'B{row}'].style = 'subheader'
+                cells = [None, self._cell(ws, item_name, style='subheader')]
             else:
-                ws[f'B{row}'].style = 'label'
-                if item_type == "total":
-                    ws[f'B{row}'].font = Font(bold=True)
+                cells = [None, self._cell(ws, item_name, style='label', font=self.FONTS['bold'] if item_type == "total" else None)]
             
             if key:
                 rows[key] = row
+                build, fmt, style = handlers[key]
+                for i, (col, prev_col) in enumerate(year_cols):
+                    cells.append(self._cell(ws, build(i, col, prev_col, row), style=style, number_format=fmt))
             
-            total_years = self.hist_years + self.fcst_years
-            
-            for i in range(total_years):
-                col = get_column_letter(3 + i)
-                prev_col = get_column_letter(2 + i) if i > 0 else None
-                
-                if key == 'ni':
-                    ws[f'{col}{row}'] = f"=IFERROR(Income_Statement!{col}26,0)"
-                    
-                elif key == 'dep':
-                    ws[f'{col}{row}'] = f"=IFERROR(-Income_Statement!{col}18,0)"
-                    
-                elif key == 'chg_ar':
-                    if i > 0:
-                        ws[f'{col}{row}'] = f"=IFERROR(Balance_Sheet!{prev_col}8-Balance_Sheet!{col}8,0)"
-                    else:
-                        ws[f'{col}{row}'] = 0
-                        
-                elif key == 'chg_inv':
-                    if i > 0:
-                        ws[f'{col}{row}'] = f"=IFERROR(Balance_Sheet!{prev_col}9-Balance_Sheet!{col}9,0)"
-                    else:
-                        ws[f'{col}{row}'] = 0
-                        
-                elif key == 'chg_ap':
-                    if i > 0:
-                        ws[f'{col}{row}'] = f"=IFERROR(Balance_Sheet!{col}20-Balance_Sheet!{prev_col}20,0)"
-                    else:
-                        ws[f'{col}{row}'] = 0
-                        
-                elif key == 'chg_other':
-                    ws[f'{col}{row}'] = 0
-                    
-                elif key == 'ocf':
-                    ws[f'{col}{row}'] = f"=SUM({col}{rows['ni']}:{col}{rows['chg_other']})"
-                    ws[f'{col}{row}'].style = 'output_cell'
-                    
-                elif key == 'capex':
-                    ws[f'{col}{row}'] = f"=IFERROR(-Income_Statement!{col}6*Assumptions!$C$21,0)"
-                    
-                elif key == 'other_inv':
-                    ws[f'{col}{row}'] = 0
-                    
-                elif key == 'icf':
-                    ws[f'{col}{row}'] = f"={col}{rows['capex']}+{col}{rows['other_inv']}"
-                    
-                elif key == 'div':
-                    ws[f'{col}{row}'] = f"=IFERROR(-Income_Statement!{col}26*0.2,0)"
-                    
-                elif key == 'chg_debt':
-                    ws[f'{col}{row}'] = 0
-                    
-                elif key == 'fcf':
-                    ws[f'{col}{row}'] = f"={col}{rows['div']}+{col}{rows['chg_debt']}"
-                    
-                elif key == 'net_cash':
-                    ws[f'{col}{row}'] = f"={col}{rows['ocf']}+{col}{rows['icf']}+{col}{rows['fcf']}"
-                    ws[f'{col}{row}'].style = 'output_cell'
-                    
-                elif key == 'open_cash':
-                    if i > 0:
-                        ws[f'{col}{row}'] = f"=IFERROR(Balance_Sheet!{prev_col}7,0)"
-                    else:
-                        ws[f'{col}{row}'] = 2000  # Starting cash
-                        
-                elif key == 'close_cash':
-                    ws[f'{col}{row}'] = f"={col}{rows['open_cash']}+{col}{rows['net_cash']}"
-                    ws[f'{col}{row}'].style = 'output_cell'
-                
-                if key:
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
-            
+            self._write_row(ws, row, cells)
             row += 1
         
         self.row_map['cf'] = rows
     
     def _create_valuation(self) -> None:
         """Create DCF valuation"""
-        ws = self._setup_sheet("Valuation", "DCF Valuation (₹ Crores)")
+        ws = self._setup_sheet("Valuation", "DCF Valuation (₹ Crores)", {'C': 15})
         
         row = 5
+        num = self.FORMATS['number']
         
         # WACC Section
-        ws[f'B{row}'] = "WACC CALCULATION"
-        ws[f'B{row}'].style = 'subheader'
+        self._write_row(ws, row, [None, self._cell(ws, "WACC CALCULATION", style='subheader')])
         row += 1
         
         wacc_items = [
@@ -990,99 +1011,102 @@ class FinancialModelGenerator:
                 row += 1
                 continue
             
-            ws[f'B{row}'] = name
-            ws[f'B{row}'].style = 'label'
-            
-            if name == "WACC":
-                ws[f'B{row}'].font = Font(bold=True)
-                ws[f'C{row}'].style = 'output_cell'
+            is_wacc = name == "WACC"
             
-            if formula:
-                ws[f'C{row}'] = formula
-                if fmt == "percent":
-                    ws[f'C{row}'].number_format = self.FORMATS['percent']
-                elif fmt == "ratio":
-                    ws[f'C{row}'].number_format = self.FORMATS['ratio']
+            if fmt == "percent":
+                number_format = self.FORMATS['percent']
+            elif fmt == "ratio":
+                number_format = self.FORMATS['ratio']
+            else:
+                number_format = None
             
+            self._write_row(ws, row, [
+                None,
+                self._cell(ws, name, style='label', font=self.FONTS['bold'] if is_wacc else None),
+                self._cell(ws, formula, style='output_cell' if is_wacc else None, number_format=number_format),
+            ])
             row += 1
         
         wacc_row = row - 1  # Row where WACC is calculated
         
         # DCF Section
         row += 2
-        ws[f'B{row}'] = "DCF VALUATION"
-        ws[f'B{row}'].style = 'subheader'
+        self._write_row(ws, row, [None, self._cell(ws, "DCF VALUATION", style='subheader')])
         row += 1
         
         # Year headers
-        for i in range(self.fcst_years):
-            col = get_column_letter(3 + i)
-            ws[f'{col}{row}'] = f"Year {i+1}"
-            ws[f'{col}{row}'].style = 'header'
+        self._write_row(ws, row, [None, None] + [
+            self._cell(ws, f"Year {i+1}", style='header') for i in range(self.fcst_years)
+        ])
         row += 1
         
         fcff_row = row
         
         # FCFF (EBITDA - Capex - WC change)
-        ws[f'B{row}'] = "Free Cash Flow to Firm"
-        ws[f'B{row}'].style = 'label'
+        cells = [None, self._cell(ws, "Free Cash Flow to Firm", style='label')]
         for i in range(self.fcst_years):
-            col = get_column_letter(3 + i)
-            is_col = get_column_letter(3 + self.hist_years + i)
-            ws[f'{col}{row}'] = f"=Income_Statement!{is_col}15+Income_Statement!{is_col}18+Cash_Flow!{is_col}19"
-            ws[f'{col}{row}'].number_format = self.FORMATS['number']
+            is_col = _COLS[3 + self.hist_years + i]
+            cells.append(self._cell(
+                ws, f"=Income_Statement!{is_col}15+Income_Statement!{is_col}18+Cash_Flow!{is_col}19",
+                number_format=num,
+            ))
+        self._write_row(ws, row, cells)
         row += 1
         
         # Discount Factor
-        ws[f'B{row}'] = "Discount Factor"
-        ws[f'B{row}'].style = 'label'
+        cells = [None, self._cell(ws, "Discount Factor", style='label')]
         for i in range(self.fcst_years):
-            col = get_column_letter(3 + i)
-            ws[f'{col}{row}'] = f"=1/(1+$C${wacc_row})^{i+1}"
-            ws[f'{col}{row}'].number_format = '0.000'
+            cells.append(self._cell(ws, f"=1/(1+$C${wacc_row})^{i+1}", number_format='0.000'))
+        self._write_row(ws, row, cells)
         row += 1
         
         # PV of FCFF
         pv_row = row
-        ws[f'B{row}'] = "Present Value of FCFF"
-        ws[f'B{row}'].style = 'label'
-        ws[f'B{row}'].font = Font(bold=True)
+        cells = [None, self._cell(ws, "Present Value of FCFF", style='label', font=self.FONTS['bold'])]
         for i in range(self.fcst_years):
-            col = get_column_letter(3 + i)
-            ws[f'{col}{row}'] = f"={col}{fcff_row}*{col}{row-1}"
-            ws[f'{col}{row}'].number_format = self.FORMATS['number']
-            ws[f'{col}{row}'].style = 'output_cell'
+            col = _COLS[3 + i]
+            cells.append(self._cell(
+                ws, f"={col}{fcff_row}*{col}{row-1}",
+                style='output_cell', number_format=num,
+            ))
+        self._write_row(ws, row, cells)
         row += 2
         
         # Terminal Value
         tv_start = row
         tg_row = row  # Terminal growth rate row
-        ws[f'B{row}'] = "Terminal Growth Rate"
-        ws[f'B{row}'].style = 'label'
-        ws[f'C{row}'] = "=Assumptions!$C$33"
-        ws[f'C{row}'].number_format = self.FORMATS['percent']
-        ws[f'C{row}'].style = 'input_cell'
+        self._write_row(ws, row, [
+            None,
+            self._cell(ws, "Terminal Growth Rate", style='label'),
+            self._cell(ws, "=Assumptions!$C$33", style='input_cell', number_format=self.FORMATS['percent']),
+        ])
         row += 1
         
-        last_fcff_col = get_column_letter(2 + self.fcst_years)
+        last_fcff_col = _COLS[2 + self.fcst_years]
         tv_row = row  # Terminal value row
-        ws[f'B{row}'] = "Terminal Value"
-        ws[f'B{row}'].style = 'label'
-        ws[f'C{row}'] = f"=IFERROR({last_fcff_col}{fcff_row}*(1+C{tg_row})/($C${wacc_row}-C{tg_row}),0)"
-        ws[f'C{row}'].number_format = self.FORMATS['number']
+        self._write_row(ws, row, [
+            None,
+            self._cell(ws, "Terminal Value", style='label'),
+            self._cell(
+                ws, f"=IFERROR({last_fcff_col}{fcff_row}*(1+C{tg_row})/($C${wacc_row}-C{tg_row}),0)",
+                number_format=num,
+            ),
+        ])
         row += 1
         
         pv_tv_row = row  # PV of terminal value row
-        ws[f'B{row}'] = "PV of Terminal Value"
-        ws[f'B{row}'].style = 'label'
-        ws[f'C{row}'] = f"=C{tv_row}*{last_fcff_col}{pv_row-1}"
-        ws[f'C{row}'].number_format = self.FORMATS['number']
-        ws[f'C{row}'].style = 'output_cell'
+        self._write_row(ws, row, [
+            None,
+            self._cell(ws, "PV of Terminal Value", style='label'),
+            self._cell(
+                ws, f"=C{tv_row}*{last_fcff_col}{pv_row-1}",
+                style='output_cell', number_format=num,
+            ),
+        ])
         row += 2
         
         # Valuation Summary
-        ws[f'B{row}'] = "VALUATION SUMMARY"
-        ws[f'B{row}'].style = 'subheader'
+        self._write_row(ws, row, [None, self._cell(ws, "VALUATION SUMMARY", style='subheader')])
         row += 1
         
         sum_pv_row = row  # Sum of PV of FCFF row
@@ -1096,7 +1120,7 @@ class FinancialModelGenerator:
             ("Sum of PV of FCFF", f"=SUM(C{pv_row}:{last_fcff_col}{pv_row})", "number"),
             ("PV of Terminal Value", f"=C{pv_tv_row}", "number"),
             ("Enterprise Value", f"=C{sum_pv_row}+C{sum_pv_row+1}", "number"),
-            ("Less: Net Debt", f"=Balance_Sheet!{get_column_letter(2+self.hist_years+self.fcst_years)}25+Balance_Sheet!{get_column_letter(2+self.hist_years+self.fcst_years)}22-Balance_Sheet!{get_column_letter(2+self.hist_years+self.fcst_years)}7", "number"),
+            ("Less: Net Debt", f"=Balance_Sheet!{_COLS[2+self.hist_years+self.fcst_years]}25+Balance_Sheet!{_COLS[2+self.hist_years+self.fcst_years]}22-Balance_Sheet!{_COLS[2+self.hist_years+self.fcst_years]}7", "number"),
             ("Equity Value", f"=C{ev_row}-C{net_debt_row}", "number"),
             ("", None, None),
             ("Shares Outstanding (Cr)", "=Assumptions!$C$37", "decimal"),
@@ -1108,22 +1132,22 @@ class FinancialModelGenerator:
                 row += 1
                 continue
             
-            ws[f'B{row}'] = name
-            ws[f'B{row}'].style = 'label'
+            is_key = name in ["Enterprise Value", "Equity Value", "Implied Share Price (₹)"]
             
-            if name in ["Enterprise Value", "Equity Value", "Implied Share Price (₹)"]:
-                ws[f'B{row}'].font = Font(bold=True)
-                ws[f'C{row}'].style = 'output_cell'
-            
-            if formula:
-                ws[f'C{row}'] = formula
-                if fmt == "number":
-                    ws[f'C{row}'].number_format = self.FORMATS['number']
-                elif fmt == "decimal":
-                    ws[f'C{row}'].number_format = self.FORMATS['decimal']
-                elif fmt == "currency":
-                    ws[f'C{row}'].number_format = self.FORMATS['currency']
+            if fmt == "number":
+                number_format = num
+            elif fmt == "decimal":
+                number_format = self.FORMATS['decimal']
+            elif fmt == "currency":
+                number_format = self.FORMATS['currency']
+            else:
+                number_format = None
             
+            self._write_row(ws, row, [
+                None,
+                self._cell(ws, name, style='label', font=self.FONTS['bold'] if is_key else None),
+                self._cell(ws, formula, style='output_cell' if is_key else None, number_format=number_format),
+            ])
             row += 1
         
         # Store valuation row references for Summary sheet and Dashboard
@@ -1138,21 +1162,9 @@ class FinancialModelGenerator:
             'shares': shares_row,
             'share_price': share_price_row,
         }
-        
-        ws.column_dimensions['C'].width = 15
     
     def _create_comps(self) -> None:
         """Create Comparable Company Analysis sheet"""
-        from openpyxl.formatting.rule import ColorScaleRule
-        
-        ws = self._setup_sheet("Comps", f"{self.company_name} - Comparable Company Analysis")
-        
-        row = 5
-        ws[f'B{row}'] = "COMPARABLE COMPANY ANALYSIS"
-        ws[f'B{row}'].style = 'subheader'
-        ws.merge_cells(f'B{row}:J{row}')
-        row += 2
-        
         # Headers
         headers = [
             ("Company", 25),
@@ -1165,33 +1177,31 @@ class FinancialModelGenerator:
             ("EV/Revenue", 12),
             ("ROE", 12),
         ]
+        widths = {_COLS[2 + i]: width for i, (_, width) in enumerate(headers)}
         
-        for i, (header, width) in enumerate(headers):
-            col = get_column_letter(2 + i)
-            ws[f'{col}{row}'] = header
-            ws[f'{col}{row}'].style = 'header'
-            ws.column_dimensions[col].width = width
+        ws = self._setup_sheet("Comps", f"{self.company_name} - Comparable Company Analysis", widths)
+        
+        row = 5
+        self._write_row(ws, row, [None, self._cell(ws, "COMPARABLE COMPANY ANALYSIS", style='subheader')])
+        self._merge_row(ws, row, 'B', 'J')
+        row += 2
+        
+        self._write_row(ws, row, [None] + [self._cell(ws, header, style='header') for header, _ in headers])
         row += 1
         
         # Target company row (from model data)
-        ws[f'B{row}'] = f"{self.company_name} (Target)"
-        ws[f'B{row}'].font = Font(bold=True)
-        ws[f'C{row}'] = "=Valuation!C46/100"  # Market cap
-        ws[f'C{row}'].number_format = self.FORMATS['number']
-        ws[f'D{row}'] = "=Income_Statement!C6"  # Revenue
-        ws[f'D{row}'].number_format = self.FORMATS['number']
-        ws[f'E{row}'] = "=Income_Statement!C15"  # EBITDA
-        ws[f'E{row}'].number_format = self.FORMATS['number']
-        ws[f'F{row}'] = "=IFERROR(E{0}/D{0},0)".format(row)
-        ws[f'F{row}'].number_format = self.FORMATS['percent']
-        ws[f'G{row}'] = "=IFERROR(Valuation!C46/Income_Statement!C26,0)"  # P/E
-        ws[f'G{row}'].number_format = self.FORMATS['decimal']
-        ws[f'H{row}'] = "=IFERROR(Valuation!C44/E{0},0)".format(row)  # EV/EBITDA
-        ws[f'H{row}'].number_format = self.FORMATS['decimal']
-        ws[f'I{row}'] = "=IFERROR(Valuation!C44/D{0},0)".format(row)  # EV/Revenue
-        ws[f'I{row}'].number_format = self.FORMATS['decimal']
-        ws[f'J{row}'] = "=Assumptions!C14"  # ROE placeholder
-        ws[f'J{row}'].number_format = self.FORMATS['percent']
+        self._write_row(ws, row, [
+            None,
+            self._cell(ws, f"{self.company_name} (Target)", font=self.FONTS['bold']),
+            self._cell(ws, "=Valuation!C46/100", number_format=self.FORMATS['number']),  # Market cap
+            self._cell(ws, "=Income_Statement!C6", number_format=self.FORMATS['number']),  # Revenue
+            self._cell(ws, "=Income_Statement!C15", number_format=self.FORMATS['number']),  # EBITDA
+            self._cell(ws, "=IFERROR(E{0}/D{0},0)".format(row), number_format=self.FORMATS['percent']),
+            self._cell(ws, "=IFERROR(Valuation!C46/Income_Statement!C26,0)", number_format=self.FORMATS['decimal']),  # P/E
+            self._cell(ws, "=IFERROR(Valuation!C44/E{0},0)".format(row), number_format=self.FORMATS['decimal']),  # EV/EBITDA
+            self._cell(ws, "=IFERROR(Valuation!C44/D{0},0)".format(row), number_format=self.FORMATS['decimal']),  # EV/Revenue
+            self._cell(ws, "=Assumptions!C14", number_format=self.FORMATS['percent']),  # ROE placeholder
+        ])
         target_row = row
         row += 1
         
@@ -1203,84 +1213,53 @@ class FinancialModelGenerator:
             ("Peer Company 4", 28000, 15000, 2800, 0.19, 20.0, 9.5, 1.8, 0.14),
             ("Peer Company 5", 60000, 32000, 6800, 0.21, 14.0, 8.0, 1.7, 0.19),
         ]
+        peer_formats = [self.FORMATS[fmt] for fmt in ('number', 'number', 'number', 'percent', 'decimal', 'decimal', 'decimal', 'percent')]
         
         peer_start = row
-        for name, mcap, rev, ebitda, margin, pe, ev_ebitda, ev_rev, roe in peer_data:
-            ws[f'B{row}'] = name
-            ws[f'B{row}'].style = 'input_cell'
-            ws[f'C{row}'] = mcap
-            ws[f'C{row}'].style = 'input_cell'
-            ws[f'C{row}'].number_format = self.FORMATS['number']
-            ws[f'D{row}'] = rev
-            ws[f'D{row}'].style = 'input_cell'
-            ws[f'D{row}'].number_format = self.FORMATS['number']
-            ws[f'E{row}'] = ebitda
-            ws[f'E{row}'].style = 'input_cell'
-            ws[f'E{row}'].number_format = self.FORMATS['number']
-            ws[f'F{row}'] = margin
-            ws[f'F{row}'].style = 'input_cell'
-            ws[f'F{row}'].number_format = self.FORMATS['percent']
-            ws[f'G{row}'] = pe
-            ws[f'G{row}'].style = 'input_cell'
-            ws[f'G{row}'].number_format = self.FORMATS['decimal']
-            ws[f'H{row}'] = ev_ebitda
-            ws[f'H{row}'].style = 'input_cell'
-            ws[f'H{row}'].number_format = self.FORMATS['decimal']
-            ws[f'I{row}'] = ev_rev
-            ws[f'I{row}'].style = 'input_cell'
-            ws[f'I{row}'].number_format = self.FORMATS['decimal']
-            ws[f'J{row}'] = roe
-            ws[f'J{row}'].style = 'input_cell'
-            ws[f'J{row}'].number_format = self.FORMATS['percent']
+        for name, *values in peer_data:
+            cells = [None, self._cell(ws, name, style='input_cell')]
+            for value, fmt in zip(values, peer_formats):
+                cells.append(self._cell(ws, value, style='input_cell', number_format=fmt))
+            self._write_row(ws, row, cells)
             row += 1
         peer_end = row - 1
         
         # Summary Statistics
         row += 2
-        ws[f'B{row}'] = "PEER STATISTICS"
-        ws[f'B{row}'].style = 'subheader'
-        ws.merge_cells(f'B{row}:J{row}')
+        self._write_row(ws, row, [None, self._cell(ws, "PEER STATISTICS", style='subheader')])
+        self._merge_row(ws, row, 'B', 'J')
         row += 1
         
+        # (label, function, extra argument after the peer range)
         stats = [
-            ("Mean", "AVERAGE"),
-            ("Median", "MEDIAN"),
-            ("25th Percentile", "PERCENTILE"),
-            ("75th Percentile", "PERCENTILE"),
+            ("Mean", "AVERAGE", ""),
+            ("Median", "MEDIAN", ""),
+            ("25th Percentile", "PERCENTILE", ",0.25"),
+            ("75th Percentile", "PERCENTILE", ",0.75"),
         ]
         
-        for stat_name, func in stats:
-            ws[f'B{row}'] = stat_name
-            ws[f'B{row}'].style = 'label'
-            
-            for i, col in enumerate(['C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']):
-                if "PERCENTILE" in func:
-                    pct = 0.25 if "25th" in stat_name else 0.75
-                    ws[f'{col}{row}'] = f"=IFERROR({func}({col}{peer_start}:{col}{peer_end},{pct}),0)"
-                else:
-                    ws[f'{col}{row}'] = f"=IFERROR({func}({col}{peer_start}:{col}{peer_end}),0)"
-                
-                if col == 'F' or col == 'J':
-                    ws[f'{col}{row}'].number_format = self.FORMATS['percent']
-                elif col in ['G', 'H', 'I']:
-                    ws[f'{col}{row}'].number_format = self.FORMATS['decimal']
-                else:
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
+        # Peer range and number format for each stat column, C through J
+        stat_cols = [
+            (f"{col}{peer_start}:{col}{peer_end}", fmt)
+            for col, fmt in zip(('C', 'D', 'E', 'F', 'G', 'H', 'I', 'J'), peer_formats)
+        ]
+        
+        for stat_name, func, extra in stats:
+            cells = [None, self._cell(ws, stat_name, style='label')]
+            for peer_range, fmt in stat_cols:
+                cells.append(self._cell(ws, f"=IFERROR({func}({peer_range}{extra}),0)", number_format=fmt))
+            self._write_row(ws, row, cells)
             row += 1
         
         # Implied Valuation
         row += 2
-        ws[f'B{row}'] = "IMPLIED VALUATION FROM COMPS"
-        ws[f'B{row}'].style = 'subheader'
-        ws.merge_cells(f'B{row}:E{row}')
+        self._write_row(ws, row, [None, self._cell(ws, "IMPLIED VALUATION FROM COMPS", style='subheader')])
+        self._merge_row(ws, row, 'B', 'E')
         row += 1
         
-        ws[f'B{row}'] = "Metric"
-        ws[f'C{row}'] = "Low"
-        ws[f'D{row}'] = "Mid"
-        ws[f'E{row}'] = "High"
-        for col in ['B', 'C', 'D', 'E']:
-            ws[f'{col}{row}'].style = 'header'
+        self._write_row(ws, row, [None] + [
+            self._cell(ws, label, style='header') for label in ("Metric", "Low", "Mid", "High")
+        ])
         row += 1
         
         mean_row = peer_end + 4  # where mean was calculated
@@ -1288,39 +1267,40 @@ class FinancialModelGenerator:
         p75_row = mean_row + 3
         
         # Implied EV from EV/EBITDA
-        ws[f'B{row}'] = "EV (from EV/EBITDA)"
-        ws[f'C{row}'] = f"=IFERROR(H{p25_row}*E{target_row},0)"
-        ws[f'D{row}'] = f"=IFERROR(H{mean_row}*E{target_row},0)"
-        ws[f'E{row}'] = f"=IFERROR(H{p75_row}*E{target_row},0)"
-        for col in ['C', 'D', 'E']:
-            ws[f'{col}{row}'].number_format = self.FORMATS['number']
+        self._write_row(ws, row, [
+            None,
+            self._cell(ws, "EV (from EV/EBITDA)"),
+            self._cell(ws, f"=IFERROR(H{p25_row}*E{target_row},0)", number_format=self.FORMATS['number']),
+            self._cell(ws, f"=IFERROR(H{mean_row}*E{target_row},0)", number_format=self.FORMATS['number']),
+            self._cell(ws, f"=IFERROR(H{p75_row}*E{target_row},0)", number_format=self.FORMATS['number']),
+        ])
         row += 1
         
         # Implied EV from EV/Revenue
-        ws[f'B{row}'] = "EV (from EV/Revenue)"
-        ws[f'C{row}'] = f"=IFERROR(I{p25_row}*D{target_row},0)"
-        ws[f'D{row}'] = f"=IFERROR(I{mean_row}*D{target_row},0)"
-        ws[f'E{row}'] = f"=IFERROR(I{p75_row}*D{target_row},0)"
-        for col in ['C', 'D', 'E']:
-            ws[f'{col}{row}'].number_format = self.FORMATS['number']
+        self._write_row(ws, row, [
+            None,
+            self._cell(ws, "EV (from EV/Revenue)"),
+            self._cell(ws, f"=IFERROR(I{p25_row}*D{target_row},0)", number_format=self.FORMATS['number']),
+            self._cell(ws, f"=IFERROR(I{mean_row}*D{target_row},0)", number_format=self.FORMATS['number']),
+            self._cell(ws, f"=IFERROR(I{p75_row}*D{target_row},0)", number_format=self.FORMATS['number']),
+        ])
         row += 1
         
         # Implied Share Price
         row += 1
-        ws[f'B{row}'] = "Implied Share Price Range"
-        ws[f'B{row}'].font = Font(bold=True)
         shares = "Valuation!C49"  # shares outstanding
-        ws[f'C{row}'] = f"=IFERROR(C{row-2}/{shares},0)"
-        ws[f'D{row}'] = f"=IFERROR(D{row-2}/{shares},0)"  
-        ws[f'E{row}'] = f"=IFERROR(E{row-2}/{shares},0)"
-        for col in ['C', 'D', 'E']:
-            ws[f'{col}{row}'].number_format = self.FORMATS['currency']
-            ws[f'{col}{row}'].style = 'output_cell'
+        self._write_row(ws, row, [
+            None,
+            self._cell(ws, "Implied Share Price Range", font=self.FONTS['bold']),
+        ] + [
+            self._cell(ws, f"=IFERROR({col}{row-2}/{shares},0)", style='output_cell', number_format=self.FORMATS['currency'])
+            for col in ['C', 'D', 'E']
+        ])
     
     def _create_summary(self) -> None:
 
         """Create executive summary sheet"""
-        ws = self.wb.create_sheet("Summary", 0)
+        ws = self._create_sheet("Summary", 0)
         
         ws.column_dimensions['A'].width = 3
         ws.column_dimensions['B'].width = 25
@@ -1329,22 +1309,25 @@ class FinancialModelGenerator:
         ws.column_dimensions['E'].width = 25
         ws.column_dimensions['F'].width = 18
         
+        # The info/output block (B:C) and the navigation block (E:F) share
+        # rows, so cells are collected per row and written out in order
+        grid = {}
+        
+        def put(row: int, col: int, cell) -> None:
+            grid.setdefault(row, [None] * 6)[col - 1] = cell
+        
         # Title
-        ws['B2'] = self.company_name
-        ws['B2'].style = 'title'
-        ws.merge_cells('B2:F2')
+        put(2, 2, self._cell(ws, self.company_name, style='title'))
+        self._merge_row(ws, 2, 'B', 'F')
         
-        ws['B3'] = "Financial Model Summary"
-        ws['B3'].font = Font(size=12, color='666666')
+        put(3, 2, self._cell(ws, "Financial Model Summary", font=self.FONTS['subtitle']))
         
-        ws['B4'] = f"Generated: {datetime.now().strftime('%d-%b-%Y')}"
-        ws['B4'].font = Font(italic=True, size=10)
+        put(4, 2, self._cell(ws, f"Generated: {datetime.now().strftime('%d-%b-%Y')}", font=self.FONTS['dated']))
         
         # Company Info
         row = 7
-        ws[f'B{row}'] = "Company Information"
-        ws[f'B{row}'].style = 'subheader'
-        ws.merge_cells(f'B{row}:C{row}')
+        put(row, 2, self._cell(ws, "Company Information", style='subheader'))
+        self._merge_row(ws, row, 'B', 'C')
         row += 1
         
         info = [
@@ -1354,16 +1337,14 @@ class FinancialModelGenerator:
         ]
         
         for label, value in info:
-            ws[f'B{row}'] = label
-            ws[f'B{row}'].style = 'label'
-            ws[f'C{row}'] = value
+            put(row, 2, self._cell(ws, label, style='label'))
+            put(row, 3, self._cell(ws, value))
             row += 1
         
         # Key Outputs - Use dynamic row references from valuation sheet
         row += 1
-        ws[f'B{row}'] = "Key Outputs"
-        ws[f'B{row}'].style = 'subheader'
-        ws.merge_cells(f'B{row}:C{row}')
+        put(row, 2, self._cell(ws, "Key Outputs", style='subheader'))
+        self._merge_row(ws, row, 'B', 'C')
         row += 1
         
         # Get dynamic row references from valuation sheet
@@ -1381,79 +1362,67 @@ class FinancialModelGenerator:
         ]
         
         for label, formula, fmt in outputs:
-            ws[f'B{row}'] = label
-            ws[f'B{row}'].style = 'label'
-            ws[f'C{row}'] = formula
-            ws[f'C{row}'].style = 'output_cell'
-            if fmt == "currency":
-                ws[f'C{row}'].number_format = self.FORMATS['currency']
-            elif fmt == "percent":
-                ws[f'C{row}'].number_format = self.FORMATS['percent']
-            else:
-                ws[f'C{row}'].number_format = self.FORMATS['number']
+            put(row, 2, self._cell(ws, label, style='label'))
+            put(row, 3, self._cell(ws, formula, style='output_cell', number_format=self.FORMATS[fmt]))
             row += 1
         
         # Navigation
         row = 7
-        ws[f'E{row}'] = "Model Navigation"
-        ws[f'E{row}'].style = 'subheader'
-        ws.merge_cells(f'E{row}:F{row}')
+        put(row, 5, self._cell(ws, "Model Navigation", style='subheader'))
+        self._merge_row(ws, row, 'E', 'F')
         row += 1
         
         sheets = ['Summary', 'Assumptions', 'Income_Statement', 'Balance_Sheet', 'Cash_Flow', 'Valuation', 'Sensitivity', 'Scenarios', 'Dashboard']
         for sheet in sheets:
-            ws[f'E{row}'] = sheet.replace('_', ' ')
-            ws[f'E{row}'].hyperlink = f"#'{sheet}'!A1"
-            ws[f'E{row}'].font = Font(color='0563C1', underline='single')
+            link = self._cell(ws, sheet.replace('_', ' '), font=self.FONTS['link'])
+            link.hyperlink = f"#'{sheet}'!A1"
+            link.hyperlink.ref = f'E{row}'  # Detached cells have no coordinate yet
+            put(row, 5, link)
             row += 1
+        
+        for row in sorted(grid):
+            self._write_row(ws, row, grid[row])
     
     def _create_sensitivity(self) -> None:
         """Create sensitivity analysis table"""
-        ws = self._setup_sheet("Sensitivity", "Sensitivity Analysis")
-        
-        row = 5
-        ws[f'B{row}'] = "WACC vs Terminal Growth Sensitivity"
-        ws[f'B{row}'].style = 'subheader'
-        ws.merge_cells(f'B{row}:H{row}')
-        row += 2
-        
         # Terminal growth rates (columns)
         tg_rates = [0.02, 0.025, 0.03, 0.035, 0.04, 0.045, 0.05]
         wacc_rates = [0.08, 0.09, 0.10, 0.11, 0.12, 0.13, 0.14]
         
+        ws = self._setup_sheet("Sensitivity", "Sensitivity Analysis", {f"C:{_COLS[2 + len(tg_rates)]}": 12})
+        
+        num = self.FORMATS['number']
+        pct = self.FORMATS['percent']
+        
+        row = 5
+        self._write_row(ws, row, [None, self._cell(ws, "WACC vs Terminal Growth Sensitivity", style='subheader')])
+        self._merge_row(ws, row, 'B', 'H')
+        row += 2
+        
         # Column headers
-        ws[f'B{row}'] = "WACC \\ TG"
-        ws[f'B{row}'].style = 'header'
-        for i, tg in enumerate(tg_rates):
-            col = get_column_letter(3 + i)
-            ws[f'{col}{row}'] = tg
-            ws[f'{col}{row}'].style = 'header'
-            ws[f'{col}{row}'].number_format = self.FORMATS['percent']
-            ws.column_dimensions[col].width = 12
+        cells = [None, self._cell(ws, "WACC \\ TG", style='header')]
+        for tg in tg_rates:
+            cells.append(self._cell(ws, tg, style='header', number_format=pct))
+        self._write_row(ws, row, cells)
         row += 1
         
         # WACC rows with sensitivity formulas
         for wacc in wacc_rates:
-            ws[f'B{row}'] = wacc
-            ws[f'B{row}'].style = 'header'
-            ws[f'B{row}'].number_format = self.FORMATS['percent']
+            cells = [None, self._cell(ws, wacc, style='header', number_format=pct)]
             
             for i, tg in enumerate(tg_rates):
-                col = get_column_letter(3 + i)
-                # Simplified sensitivity formula
-                # Equity Value = FCFF * (1+g) / (WACC - g)
-                fcff_ref = f"Valuation!C{27}"  # Last year FCFF approx
-                ws[f'{col}{row}'] = f"=IFERROR(1000*(1+{tg})/({wacc}-{tg}),0)"
-                ws[f'{col}{row}'].number_format = self.FORMATS['number']
+                # Simplified sensitivity: Equity Value = FCFF * (1+g) / (WACC - g).
+                # Every input is a constant, so write the value instead of a formula
+                value = 1000 * (1 + tg) / (wacc - tg) if wacc != tg else 0
                 
                 # Highlight center cell
-                if wacc == 0.11 and tg == 0.035:
-                    ws[f'{col}{row}'].style = 'output_cell'
+                style = 'output_cell' if wacc == 0.11 and tg == 0.035 else None
+                cells.append(self._cell(ws, value, style=style, number_format=num))
             
+            self._write_row(ws, row, cells)
             row += 1
         
         # Add color scale formatting to first table
-        from openpyxl.formatting.rule import ColorScaleRule
         first_table_end = row - 1
         first_table_start = first_table_end - len(wacc_rates) + 1
         color_range = f"C{first_table_start}:I{first_table_end}"
@@ -1467,36 +1436,29 @@ class FinancialModelGenerator:
         
         # Revenue Growth vs EBITDA Margin
         row += 3
-        ws[f'B{row}'] = "Revenue Growth vs EBITDA Margin Impact on EV"
-        ws[f'B{row}'].style = 'subheader'
-        ws.merge_cells(f'B{row}:H{row}')
+        self._write_row(ws, row, [None, self._cell(ws, "Revenue Growth vs EBITDA Margin Impact on EV", style='subheader')])
+        self._merge_row(ws, row, 'B', 'H')
         row += 2
         
         rev_growth = [0.05, 0.08, 0.10, 0.12, 0.15, 0.18, 0.20]
         ebitda_margins = [0.15, 0.20, 0.25, 0.30, 0.35]
         
-        ws[f'B{row}'] = "Growth \\ Margin"
-        ws[f'B{row}'].style = 'header'
-        for i, margin in enumerate(ebitda_margins):
-            col = get_column_letter(3 + i)
-            ws[f'{col}{row}'] = margin
-            ws[f'{col}{row}'].style = 'header'
-            ws[f'{col}{row}'].number_format = self.FORMATS['percent']
+        cells = [None, self._cell(ws, "Growth \\ Margin", style='header')]
+        for margin in ebitda_margins:
+            cells.append(self._cell(ws, margin, style='header', number_format=pct))
+        self._write_row(ws, row, cells)
         second_header_row = row
         row += 1
         
         second_start_row = row
         for growth in rev_growth:
-            ws[f'B{row}'] = growth
-            ws[f'B{row}'].style = 'header'
-            ws[f'B{row}'].number_format = self.FORMATS['percent']
+            cells = [None, self._cell(ws, growth, style='header', number_format=pct)]
             
-            for i, margin in enumerate(ebitda_margins):
-                col = get_column_letter(3 + i)
+            for margin in ebitda_margins:
                 # Simple EV proxy = Revenue * (1+g)^5 * margin * 8 (EV/EBITDA multiple)
-                ws[f'{col}{row}'] = f"=10000*((1+{growth})^5)*{margin}*8"
-                ws[f'{col}{row}'].number_format = self.FORMATS['number']
+                cells.append(self._cell(ws, 10000 * (1 + growth) ** 5 * margin * 8, number_format=num))
             
+            self._write_row(ws, row, cells)
             row += 1
         
         # Add color scale to second table
@@ -1513,17 +1475,13 @@ class FinancialModelGenerator:
 
     def _create_scenarios(self) -> None:
         """Create scenario analysis (Base/Bull/Bear)"""
-        ws = self._setup_sheet("Scenarios", "Scenario Analysis")
+        ws = self._setup_sheet("Scenarios", "Scenario Analysis", {'B:E': 18})
         
         row = 5
         # Headers
-        ws[f'B{row}'] = "Scenario"
-        ws[f'C{row}'] = "Bear"
-        ws[f'D{row}'] = "Base"
-        ws[f'E{row}'] = "Bull"
-        for col in ['B', 'C', 'D', 'E']:
-            ws[f'{col}{row}'].style = 'header'
-            ws.column_dimensions[col].width = 18
+        self._write_row(ws, row, [None] + [
+            self._cell(ws, label, style='header') for label in ("Scenario", "Bear", "Base", "Bull")
+        ])
         row += 1
         
         scenarios = [
@@ -1559,91 +1517,88 @@ class FinancialModelGenerator:
                 continue
             
             if bear is None:  # Section header
-                ws[f'B{row}'] = name
-                ws[f'B{row}'].style = 'subheader'
-                ws.merge_cells(f'B{row}:E{row}')
+                self._write_row(ws, row, [None, self._cell(ws, name, style='subheader')])
+                self._merge_row(ws, row, 'B', 'E')
                 row += 1
                 continue
             
-            ws[f'B{row}'] = name
-            ws[f'B{row}'].style = 'label'
+            number_format = self.FORMATS[fmt]
             
+            cells = [None, self._cell(ws, name, style='label')]
             for col, val in [('C', bear), ('D', base), ('E', bull)]:
-                ws[f'{col}{row}'] = val
-                if col == 'D':
-                    ws[f'{col}{row}'].style = 'input_cell'
-                
-                if fmt == "percent":
-                    ws[f'{col}{row}'].number_format = self.FORMATS['percent']
-                elif fmt == "ratio":
-                    ws[f'{col}{row}'].number_format = self.FORMATS['ratio']
-                elif fmt == "currency":
-                    ws[f'{col}{row}'].number_format = self.FORMATS['currency']
-                else:
-                    ws[f'{col}{row}'].number_format = self.FORMATS['number']
+                cells.append(self._cell(ws, val, style='input_cell' if col == 'D' else None, number_format=number_format))
             
+            self._write_row(ws, row, cells)
             row += 1
     
     def _create_dashboard(self) -> None:
         """Create visual dashboard with charts"""
-        from openpyxl.chart import LineChart, BarChart, Reference
-        from openpyxl.chart.series import SeriesLabel
-        
         ws = self._setup_sheet("Dashboard", f"{self.company_name} - Financial Dashboard")
         
-        # First create data for charts
-        row = 40  # Put data below where charts will be
-        data_start = row
+        total_years = self.hist_years + self.fcst_years
         
-        # Revenue data
-        ws[f'B{row}'] = "Chart Data"
-        ws[f'B{row}'].style = 'subheader'
-        row += 1
+        # Chart data sits below the charts (rows 40+) but the metrics block
+        # above it references the margin row, so lay out the rows first
+        data_start = 40
+        rev_row = data_start + 2
+        ebitda_row = data_start + 3
+        ni_row = data_start + 4
+        margin_row = data_start + 5
         
-        ws[f'B{row}'] = "Year"
-        total_years = self.hist_years + self.fcst_years
-        for i in range(total_years):
-            col = get_column_letter(3 + i)
-            year = self.base_year - self.hist_years + i
-            ws[f'{col}{row}'] = f"FY{year}"
-        row += 1
+        # Key Metrics Summary
+        self._write_row(ws, 22, [None, self._cell(ws, "KEY METRICS SUMMARY", style='subheader')])
+        self._merge_row(ws, 22, 'B', 'D')
         
-        # Revenue
-        ws[f'B{row}'] = "Revenue"
-        for i in range(total_years):
-            col = get_column_letter(3 + i)
-            is_col = col
-            ws[f'{col}{row}'] = f"=Income_Statement!{is_col}6"
-            ws[f'{col}{row}'].number_format = self.FORMATS['number']
-        rev_row = row
-        row += 1
+        metrics = [
+            ("Current Revenue", f"=Income_Statement!{_COLS[2+self.hist_years]}6", "number"),
+            ("Forecast Y5 Revenue", f"=Income_Statement!{_COLS[2+self.hist_years+self.fcst_years]}6", "number"),
+            ("Revenue CAGR", f"=IFERROR((Income_Statement!{_COLS[2+self.hist_years+self.fcst_years]}6/Income_Statement!{_COLS[2+self.hist_years]}6)^(1/{self.fcst_years})-1,0)", "percent"),
+            ("Current EBITDA Margin", f"={_COLS[2+self.hist_years]}{margin_row}", "percent"),
+            ("Forecast Y5 EBITDA Margin", f"={_COLS[2+self.hist_years+self.fcst_years]}{margin_row}", "percent"),
+            ("Enterprise Value", "=Valuation!C44", "number"),
+            ("Equity Value", "=Valuation!C46", "number"),
+            ("Implied Share Price", "=Valuation!C50", "currency"),
+        ]
         
-        # EBITDA
-        ws[f'B{row}'] = "EBITDA"
-        for i in range(total_years):
-            col = get_column_letter(3 + i)
-            ws[f'{col}{row}'] = f"=Income_Statement!{col}15"
-            ws[f'{col}{row}'].number_format = self.FORMATS['number']
-        ebitda_row = row
-        row += 1
+        row = 23
+        for name, formula, fmt in metrics:
+            self._write_row(ws, row, [
+                None,
+                self._cell(ws, name, style='label'),
+                self._cell(ws, formula, style='output_cell', number_format=self.FORMATS[fmt]),
+            ])
+            row += 1
         
-        # Net Income
-        ws[f'B{row}'] = "Net Income"
-        for i in range(total_years):
-            col = get_column_letter(3 + i)
-            ws[f'{col}{row}'] = f"=Income_Statement!{col}26"
-            ws[f'{col}{row}'].number_format = self.FORMATS['number']
-        ni_row = row
-        row += 1
+        # Chart data
+        self._write_row(ws, data_start, [None, self._cell(ws, "Chart Data", style='subheader')])
         
-        # EBITDA Margin
-        ws[f'B{row}'] = "EBITDA Margin %"
+        cells = [None, self._cell(ws, "Year")]
         for i in range(total_years):
-            col = get_column_letter(3 + i)
-            ws[f'{col}{row}'] = f"=IFERROR({col}{ebitda_row}/{col}{rev_row},0)"
-            ws[f'{col}{row}'].number_format = self.FORMATS['percent']
-        margin_row = row
-        row += 1
+            year = self.base_year - self.hist_years + i
+            cells.append(self._cell(ws, f"FY{year}"))
+        self._write_row(ws, data_start + 1, cells)
+        
+        year_cols = _COLS[3:3 + total_years]
+        num = self.FORMATS['number']
+        
+        pct = self.FORMATS['percent']
+        
+        # Revenue, EBITDA and Net Income straight from the income statement, plus
+        # EBITDA margin, filled column by column in a single pass over the years
+        revenue = [None, self._cell(ws, "Revenue")]
+        ebitda = [None, self._cell(ws, "EBITDA")]
+        net_income = [None, self._cell(ws, "Net Income")]
+        margin = [None, self._cell(ws, "EBITDA Margin %")]
+        for col in year_cols:
+            revenue.append(self._cell(ws, f"=Income_Statement!{col}6", number_format=num))
+            ebitda.append(self._cell(ws, f"=Income_Statement!{col}15", number_format=num))
+            net_income.append(self._cell(ws, f"=Income_Statement!{col}26", number_format=num))
+            margin.append(self._cell(ws, f"=IFERROR({col}{ebitda_row}/{col}{rev_row},0)", number_format=pct))
+        
+        self._write_row(ws, rev_row, revenue)
+        self._write_row(ws, ebitda_row, ebitda)
+        self._write_row(ws, ni_row, net_income)
+        self._write_row(ws, margin_row, margin)
         
         # Create Revenue & EBITDA Bar Chart
         chart1 = BarChart()
@@ -1698,49 +1653,14 @@ class FinancialModelGenerator:
         
         ws.add_chart(chart3, "L18")
         
-        # Key Metrics Summary
-        ws['B22'] = "KEY METRICS SUMMARY"
-        ws['B22'].style = 'subheader'
-        ws.merge_cells('B22:D22')
-        
-        metrics = [
-            ("Current Revenue", f"=Income_Statement!{get_column_letter(2+self.hist_years)}6", "number"),
-            ("Forecast Y5 Revenue", f"=Income_Statement!{get_column_letter(2+self.hist_years+self.fcst_years)}6", "number"),
-            ("Revenue CAGR", f"=IFERROR((Income_Statement!{get_column_letter(2+self.hist_years+self.fcst_years)}6/Income_Statement!{get_column_letter(2+self.hist_years)}6)^(1/{self.fcst_years})-1,0)", "percent"),
-            ("Current EBITDA Margin", f"={get_column_letter(2+self.hist_years)}{margin_row}", "percent"),
-            ("Forecast Y5 EBITDA Margin", f"={get_column_letter(2+self.hist_years+self.fcst_years)}{margin_row}", "percent"),
-            ("Enterprise Value", "=Valuation!C44", "number"),
-            ("Equity Value", "=Valuation!C46", "number"),
-            ("Implied Share Price", "=Valuation!C50", "currency"),
-        ]
-        
-        row = 23
-        for name, formula, fmt in metrics:
-            ws[f'B{row}'] = name
-            ws[f'B{row}'].style = 'label'
-            ws[f'C{row}'] = formula
-            ws[f'C{row}'].style = 'output_cell'
-            if fmt == "percent":
-                ws[f'C{row}'].number_format = self.FORMATS['percent']
-            elif fmt == "currency":
-                ws[f'C{row}'].number_format = self.FORMATS['currency']
-            else:
-                ws[f'C{row}'].number_format = self.FORMATS['number']
-            row += 1
-        
         # DCF Waterfall Data
         row = 50
-        ws[f'B{row}'] = "DCF Waterfall Data"
-        ws[f'B{row}'].style = 'subheader'
+        self._write_row(ws, row, [None, self._cell(ws, "DCF Waterfall Data", style='subheader')])
         row += 1
         
-        ws[f'B{row}'] = "Component"
-        ws[f'C{row}'] = "Value"
-        ws[f'D{row}'] = "Base"
-        ws[f'E{row}'] = "Increase"
-        ws[f'F{row}'] = "Decrease"
-        for col in ['B', 'C', 'D', 'E', 'F']:
-            ws[f'{col}{row}'].style = 'header'
+        self._write_row(ws, row, [None] + [
+            self._cell(ws, label, style='header') for label in ("Component", "Value", "Base", "Increase", "Decrease")
+        ])
         row += 1
         
         waterfall_start = row
@@ -1754,56 +1674,31 @@ class FinancialModelGenerator:
         net_debt_row = val_rows.get('net_debt', 47)  # Net Debt row
         equity_val_row = val_rows.get('equity_value', 48)  # Equity Value row
         
-        # Starting point (Sum of PV of FCF)
-        ws[f'B{row}'] = "PV of FCF"
-        ws[f'C{row}'] = f"=Valuation!C{sum_pv_row}"  # Sum of PV of FCFF
-        ws[f'C{row}'].number_format = self.FORMATS['number']
-        ws[f'D{row}'] = 0
-        ws[f'E{row}'] = "=C" + str(row)
-        ws[f'F{row}'] = 0
-        row += 1
-        
-        # Terminal Value add (PV of TV)
-        ws[f'B{row}'] = "+ Terminal Value"
-        ws[f'C{row}'] = f"=Valuation!C{sum_pv_row+1}"  # PV of Terminal Value (next row after sum_pv)
-        ws[f'C{row}'].number_format = self.FORMATS['number']
-        ws[f'D{row}'] = f"=C{row-1}+E{row-1}"
-        ws[f'E{row}'] = f"=C{row}"
-        ws[f'F{row}'] = 0
-        row += 1
-        
-        # = Enterprise Value
-        ws[f'B{row}'] = "= Enterprise Value"
-        ws[f'C{row}'] = f"=Valuation!C{ev_row}"
-        ws[f'C{row}'].number_format = self.FORMATS['number']
-        ws[f'D{row}'] = 0
-        ws[f'E{row}'] = 0
-        ws[f'F{row}'] = 0
-        row += 1
-        
-        # Less Net Debt
-        ws[f'B{row}'] = "- Net Debt"
-        ws[f'C{row}'] = f"=Valuation!C{net_debt_row}"
-        ws[f'C{row}'].number_format = self.FORMATS['number']
-        ws[f'D{row}'] = f"=Valuation!C{ev_row}"
-        ws[f'E{row}'] = 0
-        ws[f'F{row}'] = f"=ABS(C{row})"
-        row += 1
+        # Component, linked valuation cell, base, increase, decrease
+        waterfall = [
+            ("PV of FCF", f"=Valuation!C{sum_pv_row}", 0, "=C{row}", 0),  # Sum of PV of FCFF
+            ("+ Terminal Value", f"=Valuation!C{sum_pv_row+1}", "=C{prev}+E{prev}", "=C{row}", 0),  # PV of Terminal Value (next row after sum_pv)
+            ("= Enterprise Value", f"=Valuation!C{ev_row}", 0, 0, 0),
+            ("- Net Debt", f"=Valuation!C{net_debt_row}", f"=Valuation!C{ev_row}", 0, "=ABS(C{row})"),
+            ("= Equity Value", f"=Valuation!C{equity_val_row}", 0, 0, 0),
+        ]
         
-        # = Equity Value
-        ws[f'B{row}'] = "= Equity Value"
-        ws[f'C{row}'] = f"=Valuation!C{equity_val_row}"
-        ws[f'C{row}'].number_format = self.FORMATS['number']
-        ws[f'D{row}'] = 0
-        ws[f'E{row}'] = 0
-        ws[f'F{row}'] = 0
-        waterfall_end = row
-        row += 1
+        for label, value, base, increase, decrease in waterfall:
+            cells = [
+                None,
+                self._cell(ws, label),
+                self._cell(ws, value, number_format=self.FORMATS['number']),
+            ]
+            for part in (base, increase, decrease):
+                if isinstance(part, str) and '{' in part:
+                    part = part.format(row=row, prev=row - 1)
+                cells.append(self._cell(ws, part))
+            self._write_row(ws, row, cells)
+            row += 1
+        waterfall_end = row - 1
         
         # Create DCF Waterfall Chart (Stacked Bar)
-        from openpyxl.chart import BarChart as WaterfallChart
-        
-        chart4 = WaterfallChart()
+        chart4 = BarChart()
         chart4.type = "col"
         chart4.grouping = "stacked"
         chart4.title = "DCF Valuation Bridge (₹ Crores)"
@@ -1821,7 +1716,6 @@ class FinancialModelGenerator:
         chart4.set_categories(cats_wf)
         
         # Style the series - make base transparent, increase green, decrease red
-        from openpyxl.chart.series import SeriesLabel
         if len(chart4.series) >= 1:
             chart4.series[0].graphicalProperties.noFill = True  # Base is invisible
             chart4.series[0].graphicalProperties.line.noFill = True
@@ -1909,7 +1803,7 @@ def generate_financial_model(
     model_structure: Dict[str, Any],
     financial_data: Dict[str, Any],
     industry_info: Dict[str, Any],
-    output_path: str,
+    output_path: Union[str, BinaryIO],
     template_path: Optional[str] = None
 ) -> Dict[str, Any]:
     """Generate financial model"""
@@ -142,7 +142,8 @@ class JobManager:
     
     def get_history(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get job history"""
-        jobs = db.get_job_history(limit=limit)
+        # _db_to_dict rebuilds 'request' and the result extras from the payloads
+        jobs = db.get_job_history(limit=limit, include_payloads=True)
         return [self._db_to_dict(job) for job in jobs]
     
     def clear_cache(self, job_id: str = None):
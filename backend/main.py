@@ -40,6 +40,7 @@ from excel.ma_generator import generate_ma_model
 import database as db
 from agents.ai_assistant import generate_smart_assumptions, generate_valuation_commentary, parse_natural_language_request
 from data.yahoo_finance import get_stock_info, get_historical_financials, get_price_history
+from data.yahoo_finance import warmup as warmup_yahoo_session, start_session_keepalive
 from exporters import pdf_exporter, pptx_exporter
 from analysis.monte_carlo import run_monte_carlo_simulation
 from data.damodaran_data import get_all_industry_data, map_yahoo_industry, get_india_erp
@@ -71,6 +72,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# The event loop only keeps weak references to tasks; hold background
+# tasks here until they finish so they cannot be garbage-collected early
+_background_tasks: set = set()
+
+
+def _on_background_task_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_name()} failed: {task.exception()}")
+
+
+@app.on_event("startup")
+async def warm_yahoo_session():
+    """Do the Yahoo cookie/crumb handshake off the request path"""
+    task = asyncio.create_task(asyncio.to_thread(warmup_yahoo_session), name="yahoo-warmup")
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+    start_session_keepalive()
+
 # Serve Static Frontend (for Docker/Single-Container deployments)
 from fastapi.staticfiles import StaticFiles
 import os
@@ -627,7 +647,9 @@ async def _generate_model_task(
             
         output_path = os.path.join(OUTPUT_DIR, filename)
         
-        result = generate_financial_model(
+        # Build off the event loop so concurrent jobs overlap their workbook writes
+        result = await asyncio.to_thread(
+            generate_financial_model,
             company_name=company_info.get('name', symbol),
             model_structure=model_structure,
             financial_data=financial_data,
@@ -1810,7 +1832,8 @@ async def _generate_model_from_raw_task(
         filename = f"{safe_name}_{industry}_{timestamp}.xlsx"
         output_path = os.path.join(OUTPUT_DIR, filename)
         
-        generate_financial_model(
+        await asyncio.to_thread(
+            generate_financial_model,
             company_name=company_name,
             model_structure=model_structure,
             financial_data=financial_data,
@@ -2109,11 +2132,17 @@ async def get_model_preview(job_id: str):
     Returns:
         Key valuation metrics
     """
-    # Try database first
+    # Try database first (job row and its metrics in one query)
     try:
-        metrics = db.get_model_metrics(job_id)
-        if metrics:
-            return {"job_id": job_id, "metrics": metrics}
+        job = db.get_job_with_metrics(job_id)
+        if job and job["metrics"]:
+            return {
+                "job_id": job_id,
+                "company_name": job.get("company_name"),
+                "industry": job.get("industry"),
+                "status": job.get("status"),
+                "metrics": job["metrics"]
+            }
     except Exception:
         pass
     
@@ -2223,7 +2252,7 @@ async def get_yahoo_stock_data(symbol: str):
         Stock information and price history
     """
     try:
-        info = get_stock_info(symbol)
+        info = get_stock_info(symbol, real_time=True)
         if not info:
             raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
         